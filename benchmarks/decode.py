@@ -0,0 +1,111 @@
+"""Chapter-listing decode micro-benchmark.
+
+    python -m benchmarks.decode
+    python -m benchmarks.decode --chapters 50000 --runs 10
+
+Parses a synthetic `series/<slug>/chapters` body and builds the chapters the
+way AsuraAPI.get_chapters does, against the previous BaseModel built one item
+at a time. Time is the best of --runs; memory is the tracemalloc peak while
+decoding and what the finished list keeps alive, both scaled to 10k chapters.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from operator import attrgetter
+from typing import List, Optional
+
+from pydantic import BaseModel, TypeAdapter
+from rich.console import Console
+from rich.table import Table
+
+from src.fast_json import orjson
+from src.models import ChapterList
+
+
+class ModelChapter(BaseModel):
+    """Chapter as it was before it became a slotted dataclass."""
+    id: int
+    number: float
+    title: Optional[str] = None
+    slug: str
+    page_count: int = 0
+    series_slug: Optional[str] = None
+
+
+ModelChapterList = TypeAdapter(List[ModelChapter])
+
+
+def chapters_body(count: int) -> bytes:
+    # Shaped like the real listing, including fields the model ignores
+    return json.dumps({"data": [
+        {"id": i, "number": i / 2, "title": f"Chapter {i / 2:g}", "slug": f"chapter-{i:05d}-1a2b3c4d",
+         "page_count": 30, "series_slug": "benchmark-series-0badc0de",
+         "created_at": "2024-01-01T00:00:00Z", "is_locked": False}
+        for i in range(count, 0, -1)
+    ]}).encode()
+
+
+def per_item(items: list) -> list:
+    """The previous get_chapters loop."""
+    chapters = [
+        ModelChapter(
+            id=item["id"], number=float(item["number"]), title=item.get("title"), slug=item["slug"],
+            page_count=item.get("page_count", 0), series_slug=item.get("series_slug"),
+        )
+        for item in items
+    ]
+    return sorted(chapters, key=lambda x: x.number)
+
+
+def model_bulk(items: list) -> list:
+    return sorted(ModelChapterList.validate_python(items), key=attrgetter("number"))
+
+
+def bulk(items: list) -> list:
+    return sorted(ChapterList.validate_python(items), key=attrgetter("number"))
+
+
+def measure(parse, build, body: bytes, runs: int) -> dict:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        build(parse(body)["data"])
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    result = build(parse(body)["data"])
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"seconds": best, "peak": peak, "retained": retained}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chapter-listing decode micro-benchmark")
+    parser.add_argument("--chapters", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    body = chapters_body(args.chapters)
+    parsers = {"json": json.loads}
+    if orjson is not None:
+        parsers["orjson"] = orjson.loads
+    builders = {"model, per item": per_item, "model, bulk": model_bulk, "dataclass, bulk": bulk}
+
+    scale = 10_000 / args.chapters
+    table = Table(title=f"Decoding {args.chapters} chapters ({len(body) / 1e6:.1f} MB), per 10k")
+    for column in ("Parser", "Chapters", "ms", "Peak MB", "Retained MB"):
+        table.add_column(column)
+    for parser_name, parse in parsers.items():
+        for builder_name, build in builders.items():
+            r = measure(parse, build, body, args.runs)
+            table.add_row(
+                parser_name, builder_name, f"{r['seconds'] * 1000 * scale:.1f}",
+                f"{r['peak'] / 1e6 * scale:.1f}", f"{r['retained'] / 1e6 * scale:.1f}",
+            )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import io
+import json
+import random
+import re
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from PIL import Image
+from pydantic import BaseModel
+
+SERIES_SLUG = "benchmark-series-0badc0de"
+
+
+class MockConfig(BaseModel):
+    chapters: int = 10
+    pages_per_chapter: int = 20
+    page_size: int = 300 * 1024  # bytes per page
+    page_width: int = 720
+    page_height: int = 1100
+    latency: float = 0.02  # seconds before every response
+    bandwidth: float = 0  # bytes/s per response, 0 = unlimited
+    error_rate: float = 0.0  # share of image requests answered with error_status
+    error_status: int = 500
+    corrupt_rate: float = 0.0  # share of image requests answered 200 with an HTML page
+    seed: int = 0
+
+
+TAG_SIZE = 16
+
+
+def synthetic_jpeg(width: int, height: int, size: int) -> bytes:
+    """A valid JPEG of roughly `size` bytes: a flat image padded with COM segments.
+
+    The first comment holds a TAG_SIZE-byte tag (see MockAsura.page_bytes).
+    """
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), (240, 240, 240)).save(buf, "JPEG", quality=80)
+    base = buf.getvalue()
+    padding = [b"\xff\xfe" + struct.pack(">H", TAG_SIZE + 2) + b"\0" * TAG_SIZE]
+    remaining = size - len(base) - len(padding[0])
+    while remaining > 4:
+        chunk = min(remaining - 4, 65533)
+        padding.append(b"\xff\xfe" + struct.pack(">H", chunk + 2) + b"\0" * chunk)
+        remaining -= chunk + 4
+    # Comments go right after SOI
+    return base[:2] + b"".join(padding) + base[2:]
+
+
+class MockAsura:
+    """Local stand-in for the Asura API and image CDN, shaped like the real JSON responses."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.counts: Dict[str, int] = {"api": 0, "image": 0, "errors": 0, "corrupt": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._page = synthetic_jpeg(config.page_width, config.page_height, config.page_size)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self) -> "MockAsura":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.counts[key] += amount
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self.random.random() < self.config.error_rate
+
+    def should_corrupt(self) -> bool:
+        with self._lock:
+            return self.random.random() < self.config.corrupt_rate
+
+    def page_bytes(self, chapter: str, index: str) -> bytes:
+        # Same length for every page, but unique bytes so deduplication can't make pages free
+        tag = f"{chapter}/{index}".encode()[-TAG_SIZE:].ljust(TAG_SIZE, b"\0")
+        return self._page[:6] + tag + self._page[6 + TAG_SIZE:]
+
+    def series(self) -> dict:
+        return {
+            "id": 1, "slug": SERIES_SLUG, "title": "Benchmark Series", "description": "",
+            "cover": "", "status": "ongoing", "type": "manhwa", "author": "Bench", "artist": "Bench",
+            "chapter_count": self.config.chapters, "last_chapter_at": "2024-01-01T00:00:00Z",
+            "genres": [], "public_url": "", "source_url": "",
+        }
+
+    def chapters(self) -> list:
+        return [
+            {"id": i, "number": i, "title": f"Chapter {i}", "slug": f"chapter-{i:04d}",
+             "page_count": self.config.pages_per_chapter, "series_slug": SERIES_SLUG}
+            for i in range(1, self.config.chapters + 1)
+        ]
+
+    def manifest(self, chapter: str) -> dict:
+        pages = [
+            {"url": f"{self.base_url}/cdn/{chapter}/{i:03d}.jpg", "width": self.config.page_width, "height": self.config.page_height}
+            for i in range(self.config.pages_per_chapter)
+        ]
+        return {"data": {"chapter": {"slug": chapter, "pages": pages}}}
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def send_body(self, body: bytes, content_type: str, status: int = 200):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                bandwidth = mock.config.bandwidth
+                if not bandwidth:
+                    self.wfile.write(body)
+                    return
+                step = max(1024, int(bandwidth / 50))
+                for start in range(0, len(body), step):
+                    self.wfile.write(body[start:start + step])
+                    time.sleep(step / bandwidth)
+
+            def send_json(self, data, status: int = 200):
+                mock.count("api")
+                self.send_body(json.dumps(data).encode(), "application/json", status)
+
+            def do_GET(self):
+                time.sleep(mock.config.latency)
+                path = self.path.split("?")[0]
+                match = re.fullmatch(r"/cdn/([^/]+)/(\d+)\.jpg", path)
+                if match:
+                    if mock.should_fail():
+                        mock.count("errors")
+                        return self.send_body(b"error", "text/plain", mock.config.error_status)
+                    if mock.should_corrupt():
+                        mock.count("corrupt")
+                        return self.send_body(b"<html><body>Please wait...</body></html>", "image/jpeg")
+                    body = mock.page_bytes(*match.groups())
+                    mock.count("image")
+                    mock.count("bytes", len(body))
+                    return self.send_body(body, "image/jpeg")
+                match = re.fullmatch(r"/api/series/[^/]+/chapters/([^/]+)", path)
+                if match:
+                    return self.send_json(mock.manifest(match.group(1)))
+                if re.fullmatch(r"/api/series/[^/]+/chapters", path):
+                    return self.send_json({"data": mock.chapters()})
+                if re.fullmatch(r"/api/series/[^/]+", path):
+                    return self.send_json({"series": mock.series()})
+                if path == "/api/series":
+                    return self.send_json({"data": [mock.series()]})
+                self.send_json({"message": "not found"}, 404)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,218 @@
+"""Offline download benchmark against the local mock API/CDN.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --formats CBZ PDF --engines threads async --latency 0.05 --error-rate 0.02
+    python -m benchmarks.run --compare benchmarks/results/<earlier run>.json
+
+Each format/engine pair runs in its own process so peak RSS is measured per scenario.
+"""
+import argparse
+import functools
+import inspect
+import json
+import math
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from .mock_server import SERIES_SLUG, MockAsura, MockConfig
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(p * len(values)) - 1)]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def timed(fn, latencies: List[float]):
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - started)
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - started)
+    return wrapper
+
+
+def run_scenario(scenario: dict) -> dict:
+    """Runs in the child process: one download_manga call, timed from the first API request."""
+    from src.api_client import AsuraAPI
+    from src.config_manager import Settings
+    from src.downloader import create_downloader
+    from src.http_client import HttpClient
+    from src.metrics import METRICS
+
+    with tempfile.TemporaryDirectory() as download_path:
+        settings = Settings(
+            download_path=download_path,
+            download_format=scenario["format"],
+            download_engine=scenario["engine"],
+            keep_images=False,
+            # Every run starts cold and pays for every page
+            api_cache_enabled=False,
+            dedupe_pages=False,
+            **scenario["settings"],
+        )
+        http = HttpClient.from_settings(settings)
+        api = AsuraAPI(retry_count=settings.retry_count, retry_delay=settings.retry_delay, http=http)
+        api.BASE_URL = scenario["base_url"] + "/api"
+        downloader = create_downloader(settings, api, http)
+
+        latencies: List[float] = []
+        # The async engine fetches through fetch_image, the threaded one through download_image
+        for name in ("download_image", "fetch_image"):
+            if hasattr(downloader, name):
+                setattr(downloader, name, timed(getattr(downloader, name), latencies))
+
+        started = time.perf_counter()
+        manga = api.get_series_info(SERIES_SLUG)
+        summary = downloader.download_manga(manga, "all")
+        seconds = time.perf_counter() - started
+        output_bytes = sum(f.stat().st_size for f in Path(download_path).rglob("*") if f.is_file())
+
+    return {
+        "seconds": round(seconds, 3),
+        "summary": summary,
+        "pages": len(latencies),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1) if latencies else None,
+        "output_mb": round(output_bytes / 1e6, 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "http": http.stats(),
+        "metrics": METRICS.summary(),
+    }
+
+
+def run_child(mock: MockAsura, scenario: dict) -> dict:
+    before = dict(mock.counts)
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--child", json.dumps(scenario)],
+        capture_output=True, text=True, cwd=Path(__file__).parent.parent,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"{scenario['format']}/{scenario['engine']} failed:\n{process.stderr}")
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    downloaded = mock.counts["bytes"] - before["bytes"]
+    result.update({
+        "format": scenario["format"],
+        "engine": scenario["engine"],
+        "pages_per_s": round(result["pages"] / result["seconds"], 1),
+        "mb_per_s": round(downloaded / 1e6 / result["seconds"], 2),
+        "server_errors": mock.counts["errors"] - before["errors"],
+        "served_corrupt": mock.counts["corrupt"] - before["corrupt"],
+    })
+    return result
+
+
+def print_results(console: Console, results: List[dict], previous: Optional[dict]):
+    baseline = {(r["format"], r["engine"]): r for r in previous["results"]} if previous else {}
+    table = Table(title="Download benchmark")
+    for column in ("Format", "Engine", "Pages/s", "MB/s", "p50 ms", "p99 ms", "Peak RSS MB", "Failed"):
+        table.add_column(column)
+    for r in results:
+        pages_per_s = str(r["pages_per_s"])
+        old = baseline.get((r["format"], r["engine"]))
+        if old:
+            change = (r["pages_per_s"] - old["pages_per_s"]) / old["pages_per_s"] * 100
+            pages_per_s += f" ({change:+.0f}%)"
+        table.add_row(
+            r["format"], r["engine"], pages_per_s, str(r["mb_per_s"]),
+            str(r["p50_ms"]), str(r["p99_ms"]), str(r["peak_rss_mb"]), str(r["summary"]["failed"]),
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline download benchmark")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--formats", nargs="+", default=["CBZ", "PDF", "Images"])
+    parser.add_argument("--engines", nargs="+", default=["threads"])
+    parser.add_argument("--chapters", type=int, default=MockConfig().chapters)
+    parser.add_argument("--pages", type=int, default=MockConfig().pages_per_chapter, help="pages per chapter")
+    parser.add_argument("--page-kb", type=int, default=MockConfig().page_size // 1024)
+    parser.add_argument("--latency", type=float, default=MockConfig().latency, help="seconds per response")
+    parser.add_argument("--bandwidth-mbps", type=float, default=0, help="per-response bandwidth in MB/s, 0 = unlimited")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--corrupt-rate", type=float, default=0.0, help="share of pages served as HTML with status 200")
+    parser.add_argument("--threads-chapters", type=int, default=3)
+    parser.add_argument("--threads-images", type=int, default=5)
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare pages/s against")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scenario(json.loads(args.child))))
+        return
+
+    config = MockConfig(
+        chapters=args.chapters,
+        pages_per_chapter=args.pages,
+        page_size=args.page_kb * 1024,
+        latency=args.latency,
+        bandwidth=args.bandwidth_mbps * 1e6,
+        error_rate=args.error_rate,
+        corrupt_rate=args.corrupt_rate,
+    )
+    settings = {"threads_chapters": args.threads_chapters, "threads_images": args.threads_images, "retry_delay": 0}
+    console = Console()
+    mock = MockAsura(config).start()
+    try:
+        results = []
+        for engine in args.engines:
+            for fmt in args.formats:
+                console.print(f"[cyan]Running {fmt} / {engine}...[/cyan]")
+                scenario = {"base_url": mock.base_url, "format": fmt, "engine": engine, "settings": settings}
+                results.append(run_child(mock, scenario))
+    finally:
+        mock.stop()
+
+    previous = json.loads(args.compare.read_text()) if args.compare else None
+    print_results(console, results, previous)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mock": config.model_dump(),
+        "settings": settings,
+        "results": results,
+    }
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    path.write_text(json.dumps(report, indent=2))
+    console.print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""CLI startup-time check.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 50 --max-ms 250
+
+Times `python main.py --help` against a bare interpreter and fails (exit 1)
+when a heavy dependency is imported on that path or the median goes over
+--max-ms, so a stray top-level import shows up before it reaches cron.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+# Only the code paths that actually talk to the API, write files or open the GUI may load these
+HEAVY = ("requests", "urllib3", "pydantic", "PIL", "sqlite3", "httpx", "PyQt6", "multiprocessing")
+
+PROBE = """
+import json, os, runpy, sys
+sys.argv = [{main!r}, "--help"]
+sys.path.insert(0, os.path.dirname({main!r}))
+try:
+    runpy.run_path({main!r}, run_name="__main__")
+except SystemExit:
+    pass
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)), file=sys.stderr)
+"""
+
+
+def time_command(command, runs: int, cwd: str) -> list:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup-time check")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=0, help="fail when the median is slower, 0 = report only")
+    args = parser.parse_args()
+
+    # An empty directory: no config.json, and nothing should be created in it
+    with tempfile.TemporaryDirectory() as cwd:
+        bare = time_command([sys.executable, "-c", "pass"], args.runs, cwd)
+        cli = time_command([sys.executable, str(MAIN), "--help"], args.runs, cwd)
+        probe = subprocess.run(
+            [sys.executable, "-c", PROBE.format(main=str(MAIN), heavy=HEAVY)],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        )
+        loaded = json.loads(probe.stderr.strip().splitlines()[-1])
+        created = sorted(p.name for p in Path(cwd).iterdir())
+
+    median = statistics.median(cli)
+    print(f"python -c pass      median {statistics.median(bare):7.1f} ms  min {min(bare):7.1f} ms")
+    print(f"main.py --help      median {median:7.1f} ms  min {min(cli):7.1f} ms")
+    print(f"heavy modules       {', '.join(loaded) or 'none'}")
+    print(f"files created       {', '.join(created) or 'none'}")
+
+    failed = bool(loaded) or bool(created) or (args.max_ms and median > args.max_ms)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .fast_json import loads
+
+
+class CachedResponse:
+    __slots__ = ("data", "etag", "last_modified", "stored_at")
+
+    def __init__(self, data: dict, etag: Optional[str], last_modified: Optional[str], stored_at: float):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+
+class ApiCache:
+    """On-disk cache of API JSON responses with per-endpoint TTLs and LRU size eviction."""
+
+    # First match wins; published chapter manifests practically never change
+    TTLS = [
+        (re.compile(r"^series/[^/]+/chapters/[^/]+$"), 30 * 24 * 3600),
+        (re.compile(r"^series/[^/]+/chapters$"), 10 * 60),
+        (re.compile(r"^series/[^/]+$"), 60 * 60),
+        (re.compile(r"^series$"), 60 * 60),
+    ]
+    DEFAULT_TTL = 10 * 60
+    # LRU order only needs to be roughly right; touching every hit would cost a commit per read
+    TOUCH_INTERVAL = 60 * 60
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+
+    @classmethod
+    def from_settings(cls, settings) -> Optional["ApiCache"]:
+        if not settings.api_cache_enabled:
+            return None
+        return cls(Path(settings.api_cache_path), settings.api_cache_max_mb * 1024 * 1024)
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[dict]) -> str:
+        return endpoint + "?" + json.dumps(params or {}, sort_keys=True)
+
+    def ttl_for(self, endpoint: str) -> int:
+        for pattern, ttl in self.TTLS:
+            if pattern.match(endpoint):
+                return ttl
+        return self.DEFAULT_TTL
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, stored_at, accessed_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[4] >= self.TOUCH_INTERVAL:
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+        try:
+            return CachedResponse(loads(row[0]), row[1], row[2], row[3])
+        except ValueError:
+            return None
+
+    def put(self, key: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now, now, len(body)),
+            )
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, key: str):
+        # A 304 proves the cached body is still current
+        with self._lock:
+            now = time.time()
+            self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= target:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
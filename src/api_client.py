@@ -1,13 +1,20 @@
 import time
-import requests
+from operator import attrgetter
 from typing import List, Optional
-from .models import Manga, Chapter, Genre, Page
+from .models import Manga, Chapter, Page, MangaList, ChapterList, PageList
+from .fast_json import loads
+from .http_client import HttpClient
+from .api_cache import ApiCache
+from .metrics import METRICS
+from .cancellation import Cancelled, CancelToken
 import logging
 
 class AsuraAPI:
     BASE_URL = "https://api.asurascans.com/api"
 
-    def __init__(self, retry_count=3, retry_delay=2, enable_logging=False):
+    def __init__(self, retry_count=3, retry_delay=2, enable_logging=False, http: Optional[HttpClient] = None, cache: Optional[ApiCache] = None):
+        self.http = http or HttpClient()
+        self.cache = cache
         self.retry_count = retry_count
         self.retry_delay = retry_delay
         self.logger = logging.getLogger("AsuraAPI")
@@ -15,108 +22,77 @@ class AsuraAPI:
             self.logger.addHandler(logging.NullHandler())
             self.logger.propagate = False
 
-    def _request(self, method: str, endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
+    def _request(self, method: str, endpoint: str, params: Optional[dict] = None, max_age: Optional[int] = None, token: Optional[CancelToken] = None) -> Optional[dict]:
         url = f"{self.BASE_URL}/{endpoint}"
+        cached = None
+        headers = {}
+        if self.cache is not None and method == "GET":
+            key = ApiCache.make_key(endpoint, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                ttl = self.cache.ttl_for(endpoint) if max_age is None else max_age
+                if time.time() - cached.stored_at < ttl:
+                    METRICS.inc("asura_api_cache_total", result="hit")
+                    return cached.data
+                if cached.etag:
+                    headers["If-None-Match"] = cached.etag
+                if cached.last_modified:
+                    headers["If-Modified-Since"] = cached.last_modified
+
         for attempt in range(self.retry_count):
+            slot = None
             try:
-                response = requests.request(method, url, params=params, timeout=10)
+                with self.http.slot(url, token) as slot:
+                    response = self.http.request(method, url, params=params, headers=headers or None)
+                    slot.observe(response)
+                    slot.received = len(response.content)
+                if cached is not None and response.status_code == 304:
+                    self.cache.refresh(key)
+                    METRICS.inc("asura_api_cache_total", result="revalidated")
+                    return cached.data
                 response.raise_for_status()
-                return response.json()
+                data = loads(response.content)
+                if self.cache is not None and method == "GET":
+                    METRICS.inc("asura_api_cache_total", result="miss")
+                    self.cache.put(key, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                return data
+            except Cancelled:
+                return None
             except Exception as e:
                 self.logger.error(f"Attempt {attempt + 1} failed for {url}: {e}")
                 if attempt < self.retry_count - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
+                    METRICS.inc("asura_retries_total", kind="api")
+                    # Throttled hosts are paused by the limiter for Retry-After, no need to sleep twice
+                    if not (slot and slot.throttled):
+                        if token is None:
+                            time.sleep(self.retry_delay * (attempt + 1))
+                        elif not token.sleep(self.retry_delay * (attempt + 1)):
+                            return None
+        METRICS.inc("asura_failures_total", kind="api", status=(slot and slot.status) or "error")
         return None
 
     def search(self, query: str) -> List[Manga]:
         data = self._request("GET", "series", params={"search": query})
         if not data or "data" not in data:
             return []
-        
-        mangas = []
-        for item in data["data"]:
-            mangas.append(Manga(
-                id=item["id"],
-                slug=item["slug"],
-                title=item["title"],
-                alt_titles=item.get("alt_titles", []),
-                alternative_titles=item.get("alternative_titles", ""),
-                description=item.get("description", ""),
-                cover=item.get("cover", ""),
-                banner=item.get("banner", ""),
-                status=item.get("status", ""),
-                type=item.get("type", ""),
-                author=item.get("author", "Unknown"),
-                artist=item.get("artist", "Unknown"),
-                rating=item.get("rating", 0.0),
-                popularity_rank=item.get("popularity_rank", 0),
-                bookmark_count=item.get("bookmark_count", 0),
-                chapter_count=item.get("chapter_count", 0),
-                last_chapter_at=item.get("last_chapter_at", ""),
-                genres=[Genre(**g) for g in item.get("genres", [])],
-                public_url=item.get("public_url", ""),
-                source_url=item.get("source_url", "")
-            ))
-        return mangas
+        return MangaList.validate_python(data["data"])
 
-    def get_series_info(self, series_slug: str) -> Optional[Manga]:
+    def get_series_info(self, series_slug: str, max_age: Optional[int] = None) -> Optional[Manga]:
         # series_slug should be the one with the suffix if applicable
-        data = self._request("GET", f"series/{series_slug}")
+        data = self._request("GET", f"series/{series_slug}", max_age=max_age)
         if not data or "series" not in data:
             return None
-        
-        item = data["series"]
-        return Manga(
-            id=item["id"],
-            slug=item["slug"],
-            title=item["title"],
-            alt_titles=item.get("alt_titles", []),
-            alternative_titles=item.get("alternative_titles", ""),
-            description=item.get("description", ""),
-            cover=item.get("cover", ""),
-            banner=item.get("banner", ""),
-            status=item.get("status", ""),
-            type=item.get("type", ""),
-            author=item.get("author", "Unknown"),
-            artist=item.get("artist", "Unknown"),
-            rating=item.get("rating", 0.0),
-            popularity_rank=item.get("popularity_rank", 0),
-            bookmark_count=item.get("bookmark_count", 0),
-            chapter_count=item.get("chapter_count", 0),
-            last_chapter_at=item.get("last_chapter_at", ""),
-            genres=[Genre(**g) for g in item.get("genres", [])],
-            public_url=item.get("public_url", ""),
-            source_url=item.get("source_url", "")
-        )
+        return Manga.model_validate(data["series"])
 
-    def get_chapters(self, series_slug: str) -> List[Chapter]:
-        data = self._request("GET", f"series/{series_slug}/chapters")
+    def get_chapters(self, series_slug: str, max_age: Optional[int] = None) -> List[Chapter]:
+        data = self._request("GET", f"series/{series_slug}/chapters", max_age=max_age)
         if not data or "data" not in data:
             return []
-        
-        chapters = []
-        for item in data["data"]:
-            chapters.append(Chapter(
-                id=item["id"],
-                number=float(item["number"]),
-                title=item.get("title"),
-                slug=item["slug"],
-                page_count=item.get("page_count", 0),
-                series_slug=item.get("series_slug")
-            ))
-        return sorted(chapters, key=lambda x: x.number)
+        return sorted(ChapterList.validate_python(data["data"]), key=attrgetter("number"))
 
-    def get_chapter_images(self, series_base_slug: str, chapter_uuid: str) -> List[Page]:
+    def get_chapter_images(self, series_base_slug: str, chapter_uuid: str, token: Optional[CancelToken] = None) -> List[Page]:
         # Note: series_base_slug is needed here, e.g. "swordmasters-youngest-son"
-        data = self._request("GET", f"series/{series_base_slug}/chapters/{chapter_uuid}")
+        data = self._request("GET", f"series/{series_base_slug}/chapters/{chapter_uuid}", token=token)
         if not data or "data" not in data or "chapter" not in data["data"]:
             return []
-        
-        pages = []
-        for page in data["data"]["chapter"].get("pages", []):
-            pages.append(Page(
-                url=page["url"],
-                width=page.get("width", 0),
-                height=page.get("height", 0)
-            ))
-        return pages
+        return PageList.validate_python(data["data"]["chapter"].get("pages", []))
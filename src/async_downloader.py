@@ -0,0 +1,186 @@
+import asyncio
+from typing import Callable, List, Optional
+
+import httpx
+
+from .downloader import Downloader
+from .models import Manga, Chapter, Page
+from .scheduler import AsyncPageScheduler
+from .metrics import METRICS
+from .cancellation import CancelToken
+
+
+class AsyncDownloader(Downloader):
+    """Downloader engine that runs every page fetch of a job on a single event loop."""
+
+    def _client(self) -> httpx.AsyncClient:
+        limit = self.page_concurrency()
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.settings.read_timeout, connect=self.settings.connect_timeout),
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+            follow_redirects=True,
+        )
+
+    async def fetch_image(self, client: httpx.AsyncClient, page: Page, sink, index: int, name: str, token: Optional[CancelToken] = None) -> bool:
+        token = token or self.token
+        url = page.url
+        # Sink and verify calls hit the disk, SQLite and PIL; they run on worker
+        # threads so one slow page never stalls every other socket on the loop
+        if await asyncio.to_thread(sink.is_complete, name, url):
+            sink.keep(index, name)
+            METRICS.inc("asura_pages_total", source="existing")
+            return True
+        if await asyncio.to_thread(sink.from_store, index, name, url):
+            METRICS.inc("asura_pages_total", source="store")
+            return True
+
+        for attempt in range(self.settings.retry_count):
+            if not await token.wait_if_paused_async():
+                break
+            handle = None
+            slot = None
+            try:
+                offset = await asyncio.to_thread(sink.resume_offset, name, url)
+                slot = await self.http.slot_async(url, token)
+                with slot:
+                    async with client.stream("GET", url, headers=self.range_headers(offset)) as response:
+                        slot.observe(response)
+                        whole = self.part_is_whole(response, offset, sink, name)
+                        if not whole:
+                            response.raise_for_status()
+                        if response.status_code != 206 and not whole:
+                            offset = 0
+                        expected = offset if whole else self.expected_size(response.headers, response.status_code)
+                        handle = await asyncio.to_thread(self.open_page, sink, name, url, expected, offset)
+                        size = offset
+                        if not whole:
+                            async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                                token.check()
+                                handle.write(chunk)
+                                slot.received += len(chunk)
+                                size += len(chunk)
+                await asyncio.to_thread(self.verify_page, page, sink, name, handle, size, expected)
+                await asyncio.to_thread(sink.commit, index, name, handle)
+                METRICS.inc("asura_pages_total", source="network")
+                return True
+            except Exception as e:
+                if handle is not None:
+                    handle.close()
+                await asyncio.to_thread(self.reject_page, sink, name, e)
+                if token.cancelled:
+                    break
+                if attempt < self.settings.retry_count - 1:
+                    METRICS.inc("asura_retries_total", kind="page")
+                    if not (slot and slot.throttled):
+                        await token.sleep_async(self.settings.retry_delay * (attempt + 1))
+        if not token.cancelled:
+            METRICS.inc("asura_failures_total", kind="page", status=(slot and slot.status) or "error")
+        await asyncio.to_thread(sink.skip, index, name)
+        return False
+
+    @staticmethod
+    def open_page(sink, name: str, url: str, expected: Optional[int], offset: int):
+        sink.expect(name, url, expected)
+        return sink.open(name, offset)
+
+    async def fetch_pages(self, client: httpx.AsyncClient, scheduler: AsyncPageScheduler, pages: List[Page], sink, progress_callback: Optional[Callable] = None, priority: Optional[int] = None, token: Optional[CancelToken] = None):
+        if priority is None:
+            priority = scheduler.next_group()
+
+        async def fetch(i: int, page: Page):
+            await scheduler.submit(priority, i, self.fetch_image, client, page, sink, i, self.page_name(i, page), token or self.token)
+            if progress_callback:
+                progress_callback(1)
+
+        await asyncio.gather(*(fetch(i, page) for i, page in enumerate(pages)))
+
+    def download_pages(self, pages: List[Page], sink, progress_callback: Optional[Callable] = None, priority: Optional[int] = None, token: Optional[CancelToken] = None):
+        async def run():
+            async with self._client() as client, AsyncPageScheduler(self.page_concurrency()) as scheduler:
+                await self.fetch_pages(client, scheduler, pages, sink, progress_callback, token=token)
+
+        return asyncio.run(run())
+
+    def run_chapters(self, manga: Manga, chapters: List[Chapter], advance_overall: Optional[Callable] = None, chapter_progress=None, token: Optional[CancelToken] = None) -> dict:
+        return asyncio.run(self._run_chapters(manga, chapters, advance_overall, chapter_progress, token or self.token))
+
+    async def _run_chapters(self, manga: Manga, chapters: List[Chapter], advance_overall: Optional[Callable], chapter_progress, token: CancelToken) -> dict:
+        workers = self.settings.threads_chapters
+        # Same stages as the threaded engine: manifests -> page workers -> packaging, with bounded hand-offs
+        manifests: asyncio.Queue = asyncio.Queue(maxsize=self.manifest_prefetch())
+        results: List[str] = []
+        corrupt_pages = 0
+        packaging: List[asyncio.Task] = []
+
+        def finished(status: str, sink=None):
+            nonlocal corrupt_pages
+            results.append(status)
+            if sink is not None:
+                corrupt_pages += sink.corrupt
+            if advance_overall is not None:
+                advance_overall()
+
+        async with self._client() as client, AsyncPageScheduler(self.page_concurrency()) as scheduler:
+            async def prepare(chap: Chapter):
+                if not await token.wait_if_paused_async():
+                    return "cancelled"
+                # The API client is synchronous, keep it off the event loop
+                return await asyncio.to_thread(self.prepare_chapter, manga, chap, token)
+
+            async def prefetch():
+                for chap in chapters:
+                    # Priority is fixed in reading order, not by whichever manifest returns first
+                    await manifests.put((asyncio.create_task(prepare(chap)), scheduler.next_group()))
+                for _ in range(workers):
+                    await manifests.put(None)
+
+            async def package(chap: Chapter, sink, task_id, future):
+                try:
+                    ok = await asyncio.wrap_future(future)
+                except Exception:
+                    ok = False
+                if task_id is not None:
+                    chapter_progress.remove_task(task_id)
+                finished(self.chapter_status(ok, token), sink)
+
+            async def download():
+                while True:
+                    job = await manifests.get()
+                    if job is None:
+                        return
+                    prepared, priority = job
+                    cp = chapter_progress
+                    sink = None
+                    task_id = None
+                    try:
+                        manifest = await prepared
+                        if isinstance(manifest, str):
+                            finished(manifest)
+                            continue
+                        if token.cancelled:
+                            # Opening the sink would leave an empty chapter folder behind
+                            finished("cancelled")
+                            continue
+                        chap = manifest.chapter
+                        sink = self.open_sink(manga, chap)
+                        if cp is not None:
+                            task_id = cp.add_task(f"[cyan]Chapter {chap.number}", total=len(manifest.pages))
+                        await self.fetch_pages(
+                            client, scheduler, manifest.pages, sink,
+                            (lambda n, task_id=task_id: cp.update(task_id, advance=n)) if cp is not None else None,
+                            priority, token
+                        )
+                    except Exception:
+                        if task_id is not None:
+                            cp.remove_task(task_id)
+                        if sink is not None:
+                            sink.flush()
+                        finished("failed", sink)
+                        continue
+                    # Submitting blocks while the packaging backlog is full, so it happens off the loop
+                    future = await asyncio.to_thread(self.packager.submit, self.finish_chapter, manga, chap, sink)
+                    packaging.append(asyncio.create_task(package(chap, sink, task_id, future)))
+
+            await asyncio.gather(prefetch(), *(download() for _ in range(workers)))
+            await asyncio.gather(*packaging)
+        return self.summarize(results, corrupt_pages)
@@ -0,0 +1,75 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from .metrics import METRICS
+
+if TYPE_CHECKING:
+    from .api_client import AsuraAPI
+    from .downloader import Downloader
+
+
+def slug_from_target(target: str) -> str:
+    # Accepts https://asurascans.com/comics/swordmasters-youngest-son-f6174291 or the bare slug
+    match = re.search(r'/comics/([^/?#]+)', target)
+    return match.group(1) if match else target.strip("/")
+
+
+def parse_job(line: str, default_range: str = "all") -> Optional[Tuple[str, str]]:
+    """Parse 'TARGET', 'TARGET RANGE' or 'TARGET@RANGE' into (slug, range)."""
+    line = line.split("#", 1)[0].strip()
+    if not line:
+        return None
+    target, _, chapter_range = line.partition(" ")
+    if not chapter_range and "@" in target:
+        target, _, chapter_range = target.rpartition("@")
+    return slug_from_target(target), chapter_range.strip() or default_range
+
+
+def parse_jobs(lines: Iterable[str], default_range: str = "all") -> List[Tuple[str, str]]:
+    jobs = []
+    for line in lines:
+        job = parse_job(line, default_range)
+        if job is not None:
+            jobs.append(job)
+    return jobs
+
+
+def run_batch(api: "AsuraAPI", downloader: "Downloader", jobs: List[Tuple[str, str]], series_parallel: int = 2) -> dict:
+    # Every series goes through the same Downloader, so they share its connection pool and page budget
+    token = downloader.token
+
+    def run_job(job: Tuple[str, str]) -> dict:
+        slug, chapter_range = job
+        result = {"slug": slug, "range": chapter_range, "title": None, "error": None}
+        started = time.monotonic()
+        try:
+            manga = api.get_series_info(slug)
+            if manga is None:
+                result["error"] = "series not found"
+            else:
+                result["title"] = manga.title
+                result.update(downloader.download_manga(manga, chapter_range, token=token))
+        except Exception as e:
+            result["error"] = str(e)
+        result["seconds"] = round(time.monotonic() - started, 3)
+        return result
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, series_parallel)) as executor:
+        try:
+            series = list(executor.map(run_job, jobs))
+        except BaseException:
+            token.cancel()
+            raise
+
+    totals = {key: sum(s.get(key, 0) for s in series) for key in downloader.SUMMARY_KEYS}
+    totals["errors"] = sum(1 for s in series if s["error"])
+    return {
+        "series": series,
+        "totals": totals,
+        "seconds": round(time.monotonic() - started, 3),
+        "http": downloader.http.stats(),
+        "metrics": METRICS.summary(),
+    }
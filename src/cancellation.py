@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+
+class Cancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """Shared by every chapter and page worker of a job; checked between steps and between chunks."""
+
+    POLL = 0.1
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Paused workers wake up and see the cancellation
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def pause(self):
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise Cancelled()
+
+    def wait_if_paused(self) -> bool:
+        """Block while paused; False once cancelled."""
+        self._running.wait()
+        return not self.cancelled
+
+    async def wait_if_paused_async(self) -> bool:
+        while not self._running.is_set():
+            await asyncio.sleep(self.POLL)
+        return not self.cancelled
+
+    def sleep(self, seconds: float) -> bool:
+        """Interruptible sleep; False if cancelled meanwhile."""
+        return not self._cancelled.wait(seconds)
+
+    async def sleep_async(self, seconds: float) -> bool:
+        deadline = asyncio.get_running_loop().time() + seconds
+        while not self.cancelled:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return True
+            await asyncio.sleep(min(remaining, self.POLL))
+        return False
@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class ChapterState:
+    """Per-chapter record of page URLs, expected sizes and completion, kept next to the pages.
+
+    Page updates stay in memory and reach disk at most every FLUSH_INTERVAL
+    seconds, plus on flush() at chapter end or cancel. Losing the last few
+    updates to a crash only costs re-fetching those pages.
+    """
+
+    FILE_NAME = ".chapter_state.json"
+    FLUSH_INTERVAL = 2.0
+
+    def __init__(self, folder: Path, data: Optional[dict] = None):
+        self.path = folder / self.FILE_NAME
+        self.data = data or {"complete": False, "pages": {}}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    @classmethod
+    def load(cls, folder: Path) -> "ChapterState":
+        path = folder / cls.FILE_NAME
+        if path.exists():
+            try:
+                with open(path, "r") as f:
+                    return cls(folder, json.load(f))
+            except Exception:
+                pass
+        return cls(folder)
+
+    def save(self):
+        with self._lock:
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump(self.data, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+
+    def flush(self):
+        if self._dirty:
+            self.save()
+
+    def _changed(self):
+        # Called with the lock held
+        self._dirty = True
+        return time.monotonic() - self._saved_at >= self.FLUSH_INTERVAL
+
+    def page(self, name: str, url: str) -> Optional[dict]:
+        entry = self.data["pages"].get(name)
+        # A different URL means the chapter was re-uploaded and the old bytes are stale
+        if entry is None or entry.get("url") != url:
+            return None
+        return entry
+
+    def expect(self, name: str, url: str, size: Optional[int]):
+        with self._lock:
+            self.data["pages"][name] = {"url": url, "size": size, "done": False}
+            due = self._changed()
+        if due:
+            self.save()
+
+    def mark_done(self, name: str, size: int):
+        with self._lock:
+            entry = self.data["pages"].setdefault(name, {"url": None})
+            entry["size"] = size
+            entry["done"] = True
+            due = self._changed()
+        if due:
+            self.save()
+
+    @property
+    def complete(self) -> bool:
+        return self.data.get("complete", False)
+
+    def mark_complete(self):
+        self.data["complete"] = True
+        self.save()
+
+    def remove(self):
+        self.path.unlink(missing_ok=True)
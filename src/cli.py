@@ -1,31 +1,83 @@
 import typer
 import sys
 import re
-from typing import Optional
+import json
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
 from rich.live import Live
 from rich.console import Group
 from rich.panel import Panel
 from rich.prompt import Prompt, IntPrompt, Confirm
 
-from .config_manager import ConfigManager
-from .api_client import AsuraAPI
-from .downloader import Downloader
+from .batch import parse_jobs, run_batch, slug_from_target
+from .metrics import METRICS
 from .ui_components import UI, console
-from .models import Manga, Chapter
+
+if TYPE_CHECKING:
+    from .models import Manga
 
 app = typer.Typer(help="AsuraComic Downloader CLI")
 
-config_mgr = ConfigManager()
-api = AsuraAPI(
-    retry_count=config_mgr.settings.retry_count,
-    retry_delay=config_mgr.settings.retry_delay,
-    enable_logging=config_mgr.settings.enable_logging
-)
-downloader = Downloader(config_mgr.settings, api)
+class Services:
+    """Config, network stack and downloader, built on first use.
+
+    `--help`, argument errors and cron wrappers that exit early never load
+    pydantic, requests or PIL, open the SQLite files or touch download_path.
+    """
+
+    @cached_property
+    def config_mgr(self):
+        from .config_manager import ConfigManager
+        return ConfigManager()
+
+    @property
+    def settings(self):
+        return self.config_mgr.settings
+
+    @cached_property
+    def http(self):
+        from .http_client import HttpClient
+        return HttpClient.from_settings(self.settings)
+
+    @cached_property
+    def api(self):
+        from .api_client import AsuraAPI
+        from .api_cache import ApiCache
+        return AsuraAPI(
+            retry_count=self.settings.retry_count,
+            retry_delay=self.settings.retry_delay,
+            enable_logging=self.settings.enable_logging,
+            http=self.http,
+            cache=ApiCache.from_settings(self.settings)
+        )
+
+    @cached_property
+    def library(self):
+        from .library import Library
+        return Library.from_settings(self.settings)
+
+    @cached_property
+    def downloader(self):
+        from .downloader import create_downloader
+        return create_downloader(self.settings, self.api, self.http, self.library)
+
+    def rebuild_downloader(self):
+        # Picks up a changed download_engine
+        downloader = self.__dict__.pop("downloader", None)
+        if downloader is not None:
+            downloader.close()
+
+    def close(self):
+        # Only what was actually built
+        if "downloader" in self.__dict__:
+            self.downloader.close()
+
+services = Services()
 
 def search_menu():
     query = Prompt.ask("[bold yellow]Enter Search Query[/bold yellow]")
-    mangas = api.search(query)
+    mangas = services.api.search(query)
     if not mangas:
         console.print("[red]No manga found.[/red]")
         return
@@ -38,27 +90,37 @@ def search_menu():
     manga = mangas[choice - 1]
     download_interactive(manga)
 
-def download_interactive(manga: Manga):
+def download_interactive(manga: "Manga"):
     UI.display_manga_info(manga)
     
-    chapters = api.get_chapters(manga.slug)
+    chapters = services.api.get_chapters(manga.slug)
     if not chapters:
         console.print("[red]Could not retrieve chapters.[/red]")
         return
 
-    UI.display_chapter_list(chapters, limit=config_mgr.settings.chapter_list_limit)
+    UI.display_chapter_list(chapters, limit=services.settings.chapter_list_limit)
     console.print(f"[bold yellow]Total Chapters:[/bold yellow] {len(chapters)}")
     console.print(f"[bold magenta]Range Example:[/bold magenta] 1-10, 15, 20-25 or 'all'")
     range_str = Prompt.ask("[bold yellow]Enter Chapter Range[/bold yellow]", default="all")
 
     overall_progress, chapter_progress = UI.get_progress_bars()
     
-    with Live(Group(overall_progress, chapter_progress), console=console, refresh_per_second=10):
-        downloader.download_manga(manga, range_str, overall_progress, chapter_progress)
+    try:
+        with Live(Group(overall_progress, chapter_progress), console=console, refresh_per_second=10):
+            summary = services.downloader.download_manga(manga, range_str, overall_progress, chapter_progress)
+    except KeyboardInterrupt:
+        services.downloader.cancel()
+        console.print("[yellow]Download cancelled. Finished pages are kept and resume next time.[/yellow]")
+        return
 
-    console.print("[bold green]Download Complete![/bold green]")
+    if summary.get("cancelled"):
+        console.print("[yellow]Download cancelled.[/yellow]")
+    else:
+        console.print("[bold green]Download Complete![/bold green]")
+    UI.display_connection_stats(services.http.stats())
 
 def settings_menu():
+    config_mgr = services.config_mgr
     while True:
         UI.display_settings(config_mgr.settings)
         console.print("\n[bold magenta]1.[/bold magenta] Change Download Format")
@@ -68,6 +130,9 @@ def settings_menu():
         console.print("[bold magenta]5.[/bold magenta] Toggle Logging")
         console.print("[bold magenta]6.[/bold magenta] Change Download Path")
         console.print("[bold magenta]7.[/bold magenta] Change Chapter List Limit (0 = All)")
+        console.print("[bold magenta]8.[/bold magenta] Change Download Engine")
+        console.print("[bold magenta]9.[/bold magenta] Change Max Concurrent Pages (0 = Auto)")
+        console.print("[bold magenta]10.[/bold magenta] Change PDF Volume Size (0 = One PDF per Chapter)")
         console.print("[bold magenta]0.[/bold magenta] Back to Main Menu")
         
         choice = IntPrompt.ask("\n[bold yellow]Select Option[/bold yellow]", default=0)
@@ -95,6 +160,107 @@ def settings_menu():
         elif choice == 7:
             limit = IntPrompt.ask("Enter Chapter List Limit (0 for all)", default=config_mgr.settings.chapter_list_limit)
             config_mgr.update_setting("chapter_list_limit", limit)
+        elif choice == 8:
+            engine = Prompt.ask("Enter Engine (threads, async)", choices=["threads", "async"], default=config_mgr.settings.download_engine)
+            config_mgr.update_setting("download_engine", engine)
+            services.rebuild_downloader()
+        elif choice == 9:
+            pages = IntPrompt.ask("Enter Max Concurrent Page Downloads (0 for auto)", default=config_mgr.settings.max_concurrent_pages)
+            config_mgr.update_setting("max_concurrent_pages", pages)
+        elif choice == 10:
+            size = IntPrompt.ask("Enter Chapters per PDF Volume (0 for one PDF per chapter)", default=config_mgr.settings.pdf_volume_size)
+            config_mgr.update_setting("pdf_volume_size", size)
+
+def sync_library():
+    overall_progress, chapter_progress = UI.get_progress_bars()
+
+    try:
+        with Live(Group(overall_progress, chapter_progress), console=console, refresh_per_second=10):
+            results = services.downloader.sync_library(overall_progress, chapter_progress)
+    except KeyboardInterrupt:
+        services.downloader.cancel()
+        console.print("[yellow]Sync cancelled.[/yellow]")
+        return
+
+    UI.display_sync_results(results)
+
+@app.command()
+def sync():
+    """Download new chapters for every tracked series in the library."""
+    stop_exporters = METRICS.start_exporters(services.settings)
+    try:
+        sync_library()
+    finally:
+        stop_exporters()
+
+@app.command()
+def prune():
+    """Delete stored pages that no downloaded chapter uses any more."""
+    blobs, freed = services.downloader.prune_pages()
+    typer.echo(f"Removed {blobs} unused pages ({freed / 1e6:.1f} MB)")
+
+@app.command()
+def track(targets: List[str] = typer.Argument(..., help="Series URLs or slugs")):
+    """Include series in `sync`. Series not in the library yet are followed from their latest chapter on."""
+    library = services.library
+    failed = False
+    for slug in map(slug_from_target, targets):
+        if library.set_tracked(slug, True):
+            typer.echo(f"Tracking {slug}")
+            continue
+        manga = services.api.get_series_info(slug)
+        if manga is None:
+            typer.echo(f"{slug}: series not found", err=True)
+            failed = True
+            continue
+        chapters = services.api.get_chapters(manga.slug)
+        library.add_series(manga)
+        # Only releases from now on, not the whole back catalog
+        library.mark_synced(manga, chapters[-1].number if chapters else None)
+        typer.echo(f"Tracking {manga.slug} from chapter {chapters[-1].number if chapters else 0:g}")
+    if failed:
+        raise typer.Exit(1)
+
+@app.command()
+def untrack(targets: List[str] = typer.Argument(..., help="Series URLs or slugs")):
+    """Leave series out of `sync`; their downloaded chapters stay in the library."""
+    failed = False
+    for slug in map(slug_from_target, targets):
+        if services.library.set_tracked(slug, False):
+            typer.echo(f"Stopped tracking {slug}")
+        else:
+            typer.echo(f"{slug}: not in the library", err=True)
+            failed = True
+    if failed:
+        raise typer.Exit(1)
+
+@app.command()
+def download(
+    targets: Optional[List[str]] = typer.Argument(None, help="Series URLs or slugs, optionally with a range: SLUG@1-10,15"),
+    jobs_file: Optional[Path] = typer.Option(None, "--file", "-f", help="File with one 'TARGET [RANGE]' per line, '-' for stdin"),
+    chapters: str = typer.Option("all", "--chapters", "-c", help="Range used when a target doesn't give one"),
+    series_parallel: int = typer.Option(2, "--series-parallel", "-p", help="How many series to download at once"),
+):
+    """Download series without prompts and print a JSON summary."""
+    lines = list(targets or [])
+    if jobs_file is not None:
+        if str(jobs_file) == "-":
+            lines.extend(sys.stdin.read().splitlines())
+        else:
+            lines.extend(jobs_file.read_text().splitlines())
+    jobs = parse_jobs(lines, chapters)
+    if not jobs:
+        typer.echo("No series given.", err=True)
+        raise typer.Exit(2)
+
+    stop_exporters = METRICS.start_exporters(services.settings)
+    try:
+        summary = run_batch(services.api, services.downloader, jobs, series_parallel)
+    finally:
+        stop_exporters()
+    typer.echo(json.dumps(summary, indent=2))
+    if summary["totals"]["failed"] or summary["totals"]["errors"]:
+        raise typer.Exit(1)
 
 @app.command()
 def interactive():
@@ -104,11 +270,12 @@ def interactive():
         console.print("[bold magenta]1.[/bold magenta] Download Manga by URL")
         console.print("[bold magenta]2.[/bold magenta] Search for a manga by title")
         console.print("[bold magenta]3.[/bold magenta] Settings")
-        console.print("[bold magenta]4.[/bold magenta] Exit")
+        console.print("[bold magenta]4.[/bold magenta] Sync New Chapters")
+        console.print("[bold magenta]5.[/bold magenta] Exit")
         
-        choice = IntPrompt.ask("\n[bold yellow]Select Option[/bold yellow]", default=4)
+        choice = IntPrompt.ask("\n[bold yellow]Select Option[/bold yellow]", default=5)
         
-        if choice == 4:
+        if choice == 5:
             console.print("[yellow]Exiting...[/yellow]")
             sys.exit(0)
         elif choice == 1:
@@ -117,7 +284,7 @@ def interactive():
             match = re.search(r'/comics/([^/]+)', url)
             if match:
                 slug = match.group(1)
-                manga = api.get_series_info(slug)
+                manga = services.api.get_series_info(slug)
                 if manga:
                     download_interactive(manga)
                 else:
@@ -128,6 +295,16 @@ def interactive():
             search_menu()
         elif choice == 3:
             settings_menu()
+        elif choice == 4:
+            sync_library()
+
+@app.callback(invoke_without_command=True)
+def main(ctx: typer.Context):
+    # Runs on every exit path, including the menu's sys.exit
+    ctx.call_on_close(services.close)
+    # Plain `python main.py` keeps opening the interactive menu
+    if ctx.invoked_subcommand is None:
+        interactive()
 
 if __name__ == "__main__":
     app()
@@ -10,11 +10,33 @@ class Settings(BaseModel):
     keep_images: bool = True
     threads_chapters: int = 3
     threads_images: int = 5
+    max_concurrent_pages: int = 0  # 0 = threads_chapters * threads_images
+    manifest_prefetch: int = 4  # chapters whose page lists are fetched ahead
     retry_count: int = 3
     retry_delay: int = 2
     enable_logging: bool = False
     download_path: str = "downloads"
     chapter_list_limit: int = 20
+    pdf_volume_size: int = 0  # 0 = one PDF per chapter
+    transcode_format: str = Field(default="", pattern="^(|JPEG|PNG|WEBP|AVIF)$")  # "" = keep original
+    transcode_width: int = 0  # 0 = keep original width
+    transcode_quality: int = 85
+    transcode_workers: int = 0  # pages converting at once, 0 = one per CPU core
+    packaging_workers: int = 0  # 0 = one per CPU core, up to 4
+    max_connections_per_host: int = 0  # 0 = sized from the thread settings
+    adaptive_concurrency: bool = True
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    download_engine: str = Field(default="threads", pattern="^(threads|async)$")
+    api_cache_enabled: bool = True
+    api_cache_path: str = "api_cache.sqlite3"
+    api_cache_max_mb: int = 64
+    library_path: str = "library.sqlite3"
+    dedupe_pages: bool = True
+    cover_cache_path: str = "cover_cache"
+    cover_cache_max_mb: int = 128
+    metrics_textfile: str = ""  # "" = off, else a Prometheus textfile path
+    metrics_port: int = 0  # 0 = off, else serve /metrics on 127.0.0.1
 
 class ConfigManager:
     def __init__(self):
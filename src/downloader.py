@@ -1,38 +1,229 @@
 import os
 import re
-import requests
-import io
+import queue
+import logging
+import threading
 import zipfile
-import img2pdf
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Optional, Callable
-from PIL import Image
-from .models import Manga, Chapter, Page
-from .api_client import AsuraAPI
+from typing import TYPE_CHECKING, List, Optional, Callable, Tuple
+from .models import Manga, Chapter, Page, ChapterImages
+from .scheduler import PageScheduler
+from .packaging import DirectorySink, CbzSink, part_path
+from .page_store import PageStore
+from .chapter_state import ChapterState
+from .library import Library
+from .packager import Packager
+from .transcode import Transcoder, TranscodeOptions
+from .metrics import METRICS
+from .cancellation import CancelToken
+from .integrity import CorruptPage, verify_image
+
+if TYPE_CHECKING:
+    # Both arrive already built, so this module never imports requests itself
+    from .api_client import AsuraAPI
+    from .http_client import HttpClient
 
 class Downloader:
-    def __init__(self, settings, api: AsuraAPI):
+    CHUNK_SIZE = 64 * 1024
+    SUMMARY_KEYS = ("chapters", "downloaded", "skipped", "failed", "cancelled", "corrupt_pages")
+
+    def __init__(self, settings, api: "AsuraAPI", http: Optional["HttpClient"] = None, library: Optional[Library] = None):
         self.settings = settings
         self.api = api
+        self.http = http or api.http
+        self.library = library
+        # Created by the first chapter written, not here
         self.base_path = Path(settings.download_path)
-        self.base_path.mkdir(exist_ok=True, parents=True)
+        self._scheduler: Optional[PageScheduler] = None
+        self._scheduler_lock = threading.Lock()
+        self._transcoder: Optional[Transcoder] = None
+        self._packager: Optional[Packager] = None
+        self._page_store: Optional[PageStore] = None
+        # Jobs take the current token when they start; cancel() swaps in a fresh one for later jobs
+        self.token = CancelToken()
+
+    def cancel(self):
+        with self._scheduler_lock:
+            token, self.token = self.token, CancelToken()
+        token.cancel()
+
+    def pause(self):
+        self.token.pause()
+
+    def resume(self):
+        self.token.resume()
+
+    def page_concurrency(self) -> int:
+        if self.settings.max_concurrent_pages > 0:
+            return self.settings.max_concurrent_pages
+        return self.settings.threads_chapters * self.settings.threads_images
+
+    @property
+    def scheduler(self) -> PageScheduler:
+        # Shared by every chapter and job so total page parallelism is a single cap
+        with self._scheduler_lock:
+            if self._scheduler is None:
+                self._scheduler = PageScheduler(self.page_concurrency())
+            elif self._scheduler.max_workers != self.page_concurrency():
+                self._scheduler.set_max_workers(self.page_concurrency())
+            return self._scheduler
+
+    @property
+    def packager(self) -> Packager:
+        # Shared like the page scheduler, so concurrent jobs don't each bring a process pool
+        with self._scheduler_lock:
+            if self._packager is None:
+                self._packager = Packager(self.settings.packaging_workers, self.settings.threads_chapters)
+            return self._packager
+
+    def close(self):
+        """Stop the packaging workers and the shared process pool; call once no job is running."""
+        with self._scheduler_lock:
+            packager, self._packager = self._packager, None
+        if packager is not None:
+            packager.shutdown()
+
+    def transcode_options(self) -> TranscodeOptions:
+        return TranscodeOptions(self.settings.transcode_format, self.settings.transcode_width, self.settings.transcode_quality)
+
+    def transcode_pages(self, files: List[Path]) -> List[Path]:
+        options = self.transcode_options()
+        if not options.enabled:
+            return files
+        with self._scheduler_lock:
+            if self._transcoder is None or self._transcoder.options != options:
+                self._transcoder = Transcoder(options, self.settings.transcode_workers)
+            transcoder = self._transcoder
+        with METRICS.timer("transcode"):
+            return transcoder.transcode(files)
+
+    @property
+    def page_store(self) -> Optional[PageStore]:
+        if not self.settings.dedupe_pages:
+            return None
+        with self._scheduler_lock:
+            if self._page_store is None:
+                self._page_store = PageStore(self.base_path / ".pages")
+            return self._page_store
+
+    def prune_pages(self) -> Tuple[int, int]:
+        """Free stored pages whose chapters were deleted; (blobs, bytes) removed."""
+        store = self.page_store
+        if store is None:
+            # Pages stored before dedupe_pages was turned off still take space
+            if not (self.base_path / ".pages").exists():
+                return 0, 0
+            store = PageStore(self.base_path / ".pages")
+        with METRICS.timer("cleanup"):
+            return store.prune()
+
+    def stores_pages(self) -> bool:
+        # Only pages that stay on disk untouched go into the store; anything else would just be a second copy
+        keeps_pages = self.settings.keep_images or self.settings.download_format == "Images"
+        return keeps_pages and not self.transcode_options().enabled
 
     def sanitize_path(self, path: str) -> str:
         return re.sub(r'[<>:"/\\|?*]', '_', path)
 
-    def download_image(self, url: str, path: Path) -> bool:
+    @staticmethod
+    def range_headers(offset: int) -> Optional[dict]:
+        return {"Range": f"bytes={offset}-"} if offset else None
+
+    @staticmethod
+    def expected_size(headers, status_code: int) -> Optional[int]:
+        if headers.get("Content-Encoding", "identity") != "identity":
+            # Sizes describe the encoded body, not the bytes we write
+            return None
+        if status_code == 206:
+            # Content-Range: bytes 1000-4999/5000
+            total = headers.get("Content-Range", "").rpartition("/")[2]
+            return int(total) if total.isdigit() else None
+        length = headers.get("Content-Length")
+        return int(length) if length and length.isdigit() else None
+
+    @staticmethod
+    def part_is_whole(response, offset: int, sink, name: str) -> bool:
+        """Handle a 416 to a resume request: True if the .part already holds the whole body.
+
+        Otherwise the .part is stale or longer than the current file, so it is dropped
+        and the retry starts from byte 0 instead of sending the same range again.
+        """
+        if response.status_code != 416 or not offset:
+            return False
+        # Content-Range: bytes */5000
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        if total.isdigit() and int(total) == offset:
+            return True
+        sink.discard(name)
+        return False
+
+    @staticmethod
+    def verify_page(page: Page, sink, name: str, handle, size: int, expected: Optional[int]):
+        if expected is not None and size != expected:
+            raise CorruptPage("length", f"{name}: got {size} bytes, expected {expected}")
+        with sink.reader(name, handle) as fp:
+            verify_image(fp, size, page.width, page.height)
+
+    @staticmethod
+    def reject_page(sink, name: str, error: Exception):
+        # Corrupt bodies are dropped, so the retry starts from scratch instead of resuming them
+        if isinstance(error, CorruptPage):
+            sink.reject(name)
+            METRICS.inc("asura_corrupt_pages_total", reason=error.reason)
+
+    def download_image(self, page: Page, sink, index: int, name: str, token: Optional[CancelToken] = None) -> bool:
+        token = token or self.token
+        url = page.url
+        if sink.is_complete(name, url):
+            sink.keep(index, name)
+            METRICS.inc("asura_pages_total", source="existing")
+            return True
+        if sink.from_store(index, name, url):
+            METRICS.inc("asura_pages_total", source="store")
+            return True
+
         for attempt in range(self.settings.retry_count):
+            if not token.wait_if_paused():
+                break
+            handle = None
+            slot = None
             try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                with open(path, "wb") as f:
-                    f.write(response.content)
+                offset = sink.resume_offset(name, url)
+                with self.http.slot(url, token) as slot, self.http.get(url, stream=True, headers=self.range_headers(offset)) as response:
+                    slot.observe(response)
+                    whole = self.part_is_whole(response, offset, sink, name)
+                    if not whole:
+                        response.raise_for_status()
+                    if response.status_code != 206 and not whole:
+                        offset = 0
+                    expected = offset if whole else self.expected_size(response.headers, response.status_code)
+                    sink.expect(name, url, expected)
+                    handle = sink.open(name, offset)
+                    size = offset
+                    for chunk in () if whole else response.iter_content(self.CHUNK_SIZE):
+                        # Aborts the stream; a directory sink keeps the .part for the next run
+                        token.check()
+                        handle.write(chunk)
+                        slot.received += len(chunk)
+                        size += len(chunk)
+                self.verify_page(page, sink, name, handle, size, expected)
+                sink.commit(index, name, handle)
+                METRICS.inc("asura_pages_total", source="network")
                 return True
-            except Exception:
+            except Exception as e:
+                if handle is not None:
+                    handle.close()
+                self.reject_page(sink, name, e)
+                if token.cancelled:
+                    break
                 if attempt < self.settings.retry_count - 1:
-                    import time
-                    time.sleep(self.settings.retry_delay * (attempt + 1))
+                    METRICS.inc("asura_retries_total", kind="page")
+                    if not (slot and slot.throttled):
+                        token.sleep(self.settings.retry_delay * (attempt + 1))
+        if not token.cancelled:
+            METRICS.inc("asura_failures_total", kind="page", status=(slot and slot.status) or "error")
+        sink.skip(index, name)
         return False
 
     def create_comic_info(self, manga: Manga, chapter: Chapter) -> str:
@@ -50,90 +241,369 @@ class Downloader:
 </ComicInfo>"""
         return xml
 
-    def download_chapter(self, manga: Manga, chapter: Chapter, series_slug: str, progress_callback: Optional[Callable] = None):
+    def resolve_series_slug(self, manga: Manga, chapter: Chapter) -> str:
+        series_slug = chapter.series_slug or manga.slug
+        # Handle case where series_slug might have suffix
+        if '-' in series_slug and len(series_slug.split('-')[-1]) == 8:
+            series_slug = "-".join(series_slug.split('-')[:-1])
+        return series_slug
+
+    def fetch_manifest(self, manga: Manga, chapter: Chapter, token: Optional[CancelToken] = None) -> ChapterImages:
+        series_slug = self.resolve_series_slug(manga, chapter)
+        with METRICS.timer("manifest"):
+            return ChapterImages(chapter=chapter, pages=self.api.get_chapter_images(series_slug, chapter.slug, token))
+
+    def chapter_folders(self, manga: Manga, chapter: Chapter):
         manga_folder = self.base_path / self.sanitize_path(manga.title)
-        chapter_folder = manga_folder / f"Chapter {chapter.number}"
+        return manga_folder, manga_folder / f"Chapter {chapter.number}"
+
+    def output_path(self, manga: Manga, chapter: Chapter, ext: str) -> Path:
+        manga_folder, _ = self.chapter_folders(manga, chapter)
+        return manga_folder / f"{self.sanitize_path(manga.title)} - Chapter {chapter.number}.{ext}"
+
+    def page_name(self, index: int, page: Page) -> str:
+        ext = page.url.split('.')[-1].split('?')[0] or "webp"
+        return f"{index+1:03d}.{ext}"
+
+    def streams_to_cbz(self) -> bool:
+        # Loose pages would only be deleted again, so write them straight into the archive
+        # (transcoding works on files, so it keeps the on-disk path)
+        return self.settings.download_format == "CBZ" and not self.settings.keep_images and not self.transcode_options().enabled
+
+    def open_sink(self, manga: Manga, chapter: Chapter):
+        manga_folder, chapter_folder = self.chapter_folders(manga, chapter)
+        if self.streams_to_cbz():
+            manga_folder.mkdir(exist_ok=True, parents=True)
+            return CbzSink(self.output_path(manga, chapter, "cbz"), self.page_store)
         chapter_folder.mkdir(exist_ok=True, parents=True)
+        return DirectorySink(chapter_folder, self.page_store, self.stores_pages())
+
+    def volume_mode(self) -> bool:
+        return self.settings.download_format == "PDF" and self.settings.pdf_volume_size > 0
+
+    @staticmethod
+    def page_files(chapter_folder: Path) -> List[Path]:
+        if not chapter_folder.exists():
+            return []
+        return sorted(
+            f for f in chapter_folder.iterdir()
+            if f.is_file() and not f.name.startswith(".") and not f.name.endswith(".part")
+        )
+
+    def chapter_done(self, manga: Manga, chapter: Chapter) -> bool:
+        # Checked before the manifest request so finished chapters cost no network at all
+        if self.settings.download_format == "Images" or self.volume_mode():
+            manga_folder, chapter_folder = self.chapter_folders(manga, chapter)
+            state = ChapterState.load(chapter_folder)
+            if not state.complete:
+                return False
+            if self.packed_volume(manga_folder, state):
+                return True
+            return bool(self.page_files(chapter_folder))
+        ext = "pdf" if self.settings.download_format == "PDF" else "cbz"
+        return self.output_path(manga, chapter, ext).exists()
+
+    def record_chapter(self, manga: Manga, chapter: Chapter, path: Optional[Path] = None):
+        if self.library is None:
+            return
+        fmt = self.settings.download_format
+        if path is None and (fmt == "Images" or self.volume_mode()):
+            _, path = self.chapter_folders(manga, chapter)
+        elif path is None:
+            path = self.output_path(manga, chapter, "pdf" if fmt == "PDF" else "cbz")
+        size = sum(f.stat().st_size for f in path.iterdir() if f.is_file()) if path.is_dir() else path.stat().st_size
+        self.library.record_chapter(manga, chapter, fmt, path, size)
 
-        pages = self.api.get_chapter_images(series_slug, chapter.slug)
-        if not pages:
+    def skip_finished(self, manga: Manga, chapter: Chapter) -> bool:
+        if not self.chapter_done(manga, chapter):
             return False
+        # Chapters downloaded before the library existed get indexed on the way past
+        if self.library is not None and not self.library.has_chapter(manga.slug, chapter.id):
+            self.record_chapter(manga, chapter)
+        return True
 
-        image_files = []
-        with ThreadPoolExecutor(max_workers=self.settings.threads_images) as executor:
-            futures = {}
-            for i, page in enumerate(pages):
-                ext = page.url.split('.')[-1].split('?')[0] or "webp"
-                img_path = chapter_folder / f"{i+1:03d}.{ext}"
-                futures[executor.submit(self.download_image, page.url, img_path)] = img_path
+    def finish_chapter(self, manga: Manga, chapter: Chapter, sink):
+        if isinstance(sink, CbzSink):
+            if sink.failed:
+                # An incomplete archive would look finished to the next run
+                sink.abort()
+                return False
+            with METRICS.timer("packaging"):
+                sink.close(self.create_comic_info(manga, chapter))
+        elif sink.failed:
+            # Keep the pages and state so the next run only fetches what is missing
+            sink.flush()
+            if not any(sink.folder.iterdir()):
+                # Cancelled before a single page arrived
+                sink.folder.rmdir()
+            return False
+        else:
+            sink.state.mark_complete()
+            self.package_chapter(manga, chapter, self.transcode_pages(sink.files))
+        self.record_chapter(manga, chapter)
+        return True
 
-            for future in as_completed(futures):
-                img_path = futures[future]
-                if future.result():
-                    image_files.append(img_path)
-                if progress_callback:
-                    progress_callback(1)
+    def download_pages(self, pages: List[Page], sink, progress_callback: Optional[Callable] = None, priority: Optional[int] = None, token: Optional[CancelToken] = None):
+        scheduler = self.scheduler
+        if priority is None:
+            priority = scheduler.next_group()
 
-        image_files.sort()
+        # Once cancelled, queued pages return without touching the network
+        futures = [
+            scheduler.submit(priority, i, self.download_image, page, sink, i, self.page_name(i, page), token or self.token)
+            for i, page in enumerate(pages)
+        ]
+        for _ in as_completed(futures):
+            if progress_callback:
+                progress_callback(1)
+
+    def package_chapter(self, manga: Manga, chapter: Chapter, image_files: List[Path]):
+        manga_folder, chapter_folder = self.chapter_folders(manga, chapter)
+        image_files = sorted(image_files)
 
         # Conversion
         target_format = self.settings.download_format
-        if target_format == "PDF":
-            output_file = manga_folder / f"{self.sanitize_path(manga.title)} - Chapter {chapter.number}.pdf"
-            with open(output_file, "wb") as f:
-                f.write(img2pdf.convert([str(img) for img in image_files]))
-        elif target_format == "CBZ":
-            output_file = manga_folder / f"{self.sanitize_path(manga.title)} - Chapter {chapter.number}.cbz"
-            with zipfile.ZipFile(output_file, 'w') as cbz:
-                for img in image_files:
-                    cbz.write(img, arcname=img.name)
-                # Add ComicInfo.xml
-                cbz.writestr("ComicInfo.xml", self.create_comic_info(manga, chapter))
+        # Archives are written under a .part name so an existing archive always means a finished chapter
+        if target_format == "PDF" and self.volume_mode():
+            # Pages stay on disk until the whole volume is ready, see package_volume
+            return
+        with METRICS.timer("packaging"):
+            if target_format == "PDF":
+                self.packager.write_pdf(self.output_path(manga, chapter, "pdf"), image_files)
+            elif target_format == "CBZ":
+                output_file = self.output_path(manga, chapter, "cbz")
+                with zipfile.ZipFile(part_path(output_file), 'w') as cbz:
+                    for img in image_files:
+                        cbz.write(img, arcname=img.name)
+                    # Add ComicInfo.xml
+                    cbz.writestr("ComicInfo.xml", self.create_comic_info(manga, chapter))
+                os.replace(part_path(output_file), output_file)
 
         # Cleanup
         if not self.settings.keep_images and target_format != "Images":
-            for img in image_files:
-                img.unlink()
-            if not any(chapter_folder.iterdir()):
-                chapter_folder.rmdir()
+            with METRICS.timer("cleanup"):
+                for img in image_files:
+                    img.unlink()
+                ChapterState.load(chapter_folder).remove()
+                if not any(chapter_folder.iterdir()):
+                    chapter_folder.rmdir()
+
+    def volume_path(self, manga: Manga, chapters: List[Chapter]) -> Path:
+        manga_folder, _ = self.chapter_folders(manga, chapters[0])
+        return manga_folder / f"{self.sanitize_path(manga.title)} - Chapters {chapters[0].number}-{chapters[-1].number}.pdf"
+
+    @staticmethod
+    def packed_volume(manga_folder: Path, state: ChapterState) -> bool:
+        volume = state.data.get("volume")
+        return bool(volume) and (manga_folder / volume).exists()
 
+    def package_volume(self, manga: Manga, chapters: List[Chapter]) -> bool:
+        if self.volume_path(manga, chapters).exists():
+            return True
+        manga_folder, _ = self.chapter_folders(manga, chapters[0])
+        folders = {c.id: self.chapter_folders(manga, c)[1] for c in chapters}
+        # Chapters already packed by an earlier, differently aligned run stay in their volume
+        chapters = [c for c in chapters if not self.packed_volume(manga_folder, ChapterState.load(folders[c.id]))]
+        if not chapters:
+            return True
+        folders = [folders[c.id] for c in chapters]
+        if not all(ChapterState.load(f).complete and self.page_files(f) for f in folders):
+            return False
+        # What's left of the volume; a single leftover chapter gets its own PDF
+        if len(chapters) == 1:
+            output_file = self.output_path(manga, chapters[0], "pdf")
+        else:
+            output_file = self.volume_path(manga, chapters)
+
+        # Pages are streamed chapter by chapter, so memory stays at one page however long the volume
+        with METRICS.timer("packaging"):
+            self.packager.write_pdf(output_file, [page for folder in folders for page in self.page_files(folder)])
+
+        for chapter, folder in zip(chapters, folders):
+            state = ChapterState.load(folder)
+            state.data["volume"] = output_file.name
+            state.save()
+            self.record_chapter(manga, chapter, output_file)
+            if not self.settings.keep_images:
+                for page in self.page_files(folder):
+                    page.unlink()
         return True
 
-    def download_manga(self, manga: Manga, chapter_range: str, overall_progress=None, chapter_progress=None):
+    @staticmethod
+    def summarize(results: List[str], corrupt_pages: int = 0) -> dict:
+        return {
+            "chapters": len(results),
+            "downloaded": results.count("downloaded"),
+            "skipped": results.count("skipped"),
+            "failed": results.count("failed"),
+            "cancelled": results.count("cancelled"),
+            # Bad bodies that were caught and fetched again; pages that never came good count under failed
+            "corrupt_pages": corrupt_pages,
+        }
+
+    def download_manga(self, manga: Manga, chapter_range: str, overall_progress=None, chapter_progress=None, token: Optional[CancelToken] = None) -> dict:
         chapters = self.api.get_chapters(manga.slug)
         if not chapters:
-            return
+            return self.summarize([])
 
         selected_chapters = self.parse_range(chapter_range, chapters)
-        
-        overall_task = None
+        return self.download_chapters(manga, selected_chapters, overall_progress, chapter_progress, token)
+
+    def download_chapters(self, manga: Manga, chapters: List[Chapter], overall_progress=None, chapter_progress=None, token: Optional[CancelToken] = None) -> dict:
+        token = token or self.token
+        advance_overall = None
         if overall_progress:
-            overall_task = overall_progress.add_task("[green]Total Progress", total=len(selected_chapters))
-
-        with ThreadPoolExecutor(max_workers=self.settings.threads_chapters) as executor:
-            futures = []
-            for chapter in selected_chapters:
-                def run_download(chap=chapter):
-                    series_slug = chap.series_slug or manga.slug
-                    # Handle case where series_slug might have suffix
-                    if '-' in series_slug and len(series_slug.split('-')[-1]) == 8:
-                         series_slug = "-".join(series_slug.split('-')[:-1])
-
-                    pages = self.api.get_chapter_images(series_slug, chap.slug)
-                    cp = chapter_progress
-                    if cp is not None:
-                        task_id = cp.add_task(f"[cyan]Chapter {chap.number}", total=len(pages))
-                        res = self.download_chapter(manga, chap, series_slug, lambda n: cp.update(task_id, advance=n))
-                        cp.remove_task(task_id)
-                    else:
-                        res = self.download_chapter(manga, chap, series_slug)
-                    return res
-
-                futures.append(executor.submit(run_download))
-
-            for future in as_completed(futures):
-                if overall_progress is not None and overall_task is not None:
-                    overall_progress.update(overall_task, advance=1)
+            overall_task = overall_progress.add_task("[green]Total Progress", total=len(chapters))
+            advance_overall = lambda: overall_progress.update(overall_task, advance=1)
+
+        if not self.volume_mode():
+            return self.run_chapters(manga, chapters, advance_overall, chapter_progress, token)
+
+        size = self.settings.pdf_volume_size
+        results = []
+        volumes = []
+        for start in range(0, len(chapters), size):
+            volume = chapters[start:start + size]
+            summary = self.run_chapters(manga, volume, advance_overall, chapter_progress, token)
+            results.append(summary)
+            if not token.cancelled:
+                # Built while the next volume downloads
+                volumes.append((summary, self.packager.submit(self.package_volume, manga, volume)))
+        for summary, future in volumes:
+            try:
+                packed = future.result()
+            except Exception:
+                packed = False
+            if not packed:
+                # Without their PDF these chapters aren't done; the next run packs them again
+                summary["failed"] += summary["downloaded"] + summary["skipped"]
+                summary["downloaded"] = summary["skipped"] = 0
+        return {key: sum(r[key] for r in results) for key in self.SUMMARY_KEYS}
+
+    def chapter_status(self, ok: bool, token: CancelToken) -> str:
+        if ok:
+            return "downloaded"
+        return "cancelled" if token.cancelled else "failed"
+
+    def manifest_prefetch(self) -> int:
+        return max(1, self.settings.manifest_prefetch)
+
+    def prepare_chapter(self, manga: Manga, chapter: Chapter, token: CancelToken):
+        """Manifest stage for one chapter: its manifest, or the final status when there is nothing to download."""
+        if not token.wait_if_paused():
+            return "cancelled"
+        if self.skip_finished(manga, chapter):
+            return "skipped"
+        manifest = self.fetch_manifest(manga, chapter, token)
+        return manifest if manifest.pages else self.chapter_status(False, token)
+
+    def prefetch_manifests(self, manga: Manga, chapters: List[Chapter], manifests: queue.Queue, token: CancelToken, workers: int):
+        """Keeps up to manifest_prefetch chapters fetching or ready ahead of the page workers, in reading order."""
+        scheduler = self.scheduler
+        with ThreadPoolExecutor(max_workers=self.manifest_prefetch(), thread_name_prefix="manifest") as pool:
+            for chapter in chapters:
+                # Priority is fixed in reading order, not by whichever manifest returns first
+                manifests.put((pool.submit(self.prepare_chapter, manga, chapter, token), scheduler.next_group()))
+            for _ in range(workers):
+                manifests.put(None)
+
+    def download_stage(self, manga: Manga, manifests: queue.Queue, done: queue.Queue, chapter_progress, token: CancelToken):
+        """Page stage: one chapter at a time, handed to packaging as soon as its pages are in."""
+        while True:
+            job = manifests.get()
+            if job is None:
+                return
+            prepared, priority = job
+            sink = None
+            task_id = None
+            try:
+                manifest = prepared.result()
+                if isinstance(manifest, str):
+                    done.put((manifest, 0))
+                    continue
+                if token.cancelled:
+                    # Opening the sink would leave an empty chapter folder behind
+                    done.put(("cancelled", 0))
+                    continue
+                chapter = manifest.chapter
+                sink = self.open_sink(manga, chapter)
+                callback = None
+                if chapter_progress is not None:
+                    task_id = chapter_progress.add_task(f"[cyan]Chapter {chapter.number}", total=len(manifest.pages))
+                    callback = lambda n, task_id=task_id: chapter_progress.update(task_id, advance=n)
+                self.download_pages(manifest.pages, sink, callback, priority, token)
+            except Exception:
+                if task_id is not None:
+                    chapter_progress.remove_task(task_id)
+                if sink is not None:
+                    sink.flush()
+                done.put(("failed", sink.corrupt if sink else 0))
+                continue
+            # Blocks only while the packaging backlog is full
+            self.packager.submit(self.package_stage, manga, chapter, sink, chapter_progress, task_id, done, token)
+
+    def package_stage(self, manga: Manga, chapter: Chapter, sink, chapter_progress, task_id, done: queue.Queue, token: CancelToken):
+        try:
+            ok = self.finish_chapter(manga, chapter, sink)
+        except Exception:
+            ok = False
+        if task_id is not None:
+            chapter_progress.remove_task(task_id)
+        done.put((self.chapter_status(ok, token), sink.corrupt))
+
+    def run_chapters(self, manga: Manga, chapters: List[Chapter], advance_overall: Optional[Callable] = None, chapter_progress=None, token: Optional[CancelToken] = None) -> dict:
+        token = token or self.token
+        workers = self.settings.threads_chapters
+        # Stages hand off through bounded queues: manifests -> page workers -> packaging
+        manifests = queue.Queue(maxsize=self.manifest_prefetch())
+        done = queue.Queue()
+        results = []
+        corrupt_pages = 0
+        with ThreadPoolExecutor(max_workers=workers + 1) as executor:
+            executor.submit(self.prefetch_manifests, manga, chapters, manifests, token, workers)
+            for _ in range(workers):
+                executor.submit(self.download_stage, manga, manifests, done, chapter_progress, token)
+            try:
+                for _ in chapters:
+                    status, corrupt = done.get()
+                    results.append(status)
+                    corrupt_pages += corrupt
+                    if advance_overall is not None:
+                        advance_overall()
+            except BaseException:
+                # Ctrl+C lands here; without this the stages would finish every queued chapter before exiting
+                token.cancel()
+                raise
+        return self.summarize(results, corrupt_pages)
+
+    def sync_series(self, slug: str, overall_progress=None, chapter_progress=None, token: Optional[CancelToken] = None) -> Optional[int]:
+        # Revalidate instead of trusting the cache: this is the call that notices new chapters
+        manga = self.api.get_series_info(slug, max_age=0)
+        if manga is None:
+            return None
+        self.library.add_series(manga)
+        if manga.last_chapter_at and manga.last_chapter_at == self.library.last_chapter_at(slug):
+            return 0
+
+        chapters = self.api.get_chapters(manga.slug, max_age=0)
+        missing = self.library.missing_chapters(manga, chapters)
+        if missing:
+            self.download_chapters(manga, missing, overall_progress, chapter_progress, token)
+        # Only remember the series as up to date once nothing is left to fetch
+        if chapters and not self.library.missing_chapters(manga, chapters):
+            self.library.mark_synced(manga, chapters[-1].number)
+        return len(missing)
+
+    def sync_library(self, overall_progress=None, chapter_progress=None) -> dict:
+        token = self.token
+        results = {}
+        for slug in self.library.tracked_series():
+            if token.cancelled:
+                break
+            results[slug] = self.sync_series(slug, overall_progress, chapter_progress, token)
+        if not token.cancelled:
+            self.prune_pages()
+        return results
 
     def parse_range(self, range_str: str, all_chapters: List[Chapter]) -> List[Chapter]:
         if range_str.lower() == "all":
@@ -156,3 +626,13 @@ class Downloader:
                     pass
         
         return [c for c in all_chapters if c.number in selected_numbers]
+
+
+def create_downloader(settings, api: "AsuraAPI", http: Optional["HttpClient"] = None, library: Optional[Library] = None) -> Downloader:
+    if settings.download_engine == "async":
+        try:
+            from .async_downloader import AsyncDownloader
+            return AsyncDownloader(settings, api, http, library)
+        except ImportError:
+            logging.getLogger("Downloader").warning("httpx is not installed, falling back to the threaded engine")
+    return Downloader(settings, api, http, library)
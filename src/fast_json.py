@@ -0,0 +1,13 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib parser gives the same result, just slower
+    orjson = None
+
+
+def loads(data):
+    """Parse a JSON response body (bytes or str) with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,73 @@
+from typing import Iterable, List
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from ..models import Chapter
+
+
+class ChapterTableModel(QAbstractTableModel):
+    """Chapter list for the series page; rows are rendered on demand and checks live in a set of row numbers."""
+
+    HEADERS = ["Select", "Number", "Title"]
+
+    def __init__(self, chapters: List[Chapter], parent=None):
+        super().__init__(parent)
+        self.chapters = chapters
+        self.checked = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.chapters)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if column == 0 and role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if row in self.checked else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.DisplayRole:
+            chapter = self.chapters[row]
+            if column == 1:
+                return f"Chapter {chapter.number}"
+            if column == 2:
+                return chapter.title or ""
+        return None
+
+    def flags(self, index):
+        # Clicking anywhere on a row toggles it (see toggle), so the checkbox itself is not editable
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def _changed(self, rows: Iterable[int]):
+        rows = list(rows)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), 0), [Qt.ItemDataRole.CheckStateRole])
+
+    def toggle(self, row: int):
+        self.checked.symmetric_difference_update((row,))
+        self._changed((row,))
+
+    def set_checked(self, rows: Iterable[int], checked: bool = True):
+        rows = set(rows)
+        if checked:
+            self.checked |= rows
+        else:
+            self.checked -= rows
+        self._changed(rows)
+
+    def check_all(self):
+        self.checked = set(range(len(self.chapters)))
+        self._changed((0, len(self.chapters) - 1) if self.chapters else ())
+
+    def clear_checks(self):
+        changed, self.checked = self.checked, set()
+        self._changed(changed)
+
+    def selected_chapters(self) -> List[Chapter]:
+        return [self.chapters[row] for row in sorted(self.checked)]
@@ -0,0 +1,99 @@
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QSize, Qt, QThreadPool
+from PyQt6.QtGui import QImage, QPixmap
+
+from .workers import TaskWorker
+
+Key = Tuple[str, int, int]
+
+
+class CoverLoader(QObject):
+    """Loads cover images for the GUI through a memory LRU, a disk cache and a small pool.
+
+    Download, decode and scaling all happen in the pool; the GUI thread only
+    turns the finished QImage into a pixmap. Requests for a cover that is
+    already loading share the same fetch.
+    """
+
+    def __init__(self, http, cache_dir: Path, max_images: int = 256, max_disk_mb: int = 128, workers: int = 4):
+        super().__init__()
+        self.http = http
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_images = max_images
+        self._images: "OrderedDict[Key, QImage]" = OrderedDict()
+        self._waiting: Dict[Key, List[Callable[[QPixmap], None]]] = {}
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(workers)
+        self._prune(max_disk_mb * 1024 * 1024)
+
+    @classmethod
+    def from_settings(cls, http, settings) -> "CoverLoader":
+        return cls(http, Path(settings.cover_cache_path), max_disk_mb=settings.cover_cache_max_mb)
+
+    def _prune(self, max_bytes: int):
+        # Oldest covers go first; runs once at startup so lookups stay a plain file read
+        files = sorted(self.cache_dir.iterdir(), key=lambda f: f.stat().st_mtime, reverse=True)
+        total = 0
+        for f in files:
+            total += f.stat().st_size
+            if total > max_bytes:
+                f.unlink(missing_ok=True)
+
+    def cache_file(self, url: str) -> Path:
+        return self.cache_dir / hashlib.sha1(url.encode()).hexdigest()
+
+    def fetch(self, url: str, size: QSize) -> Optional[QImage]:
+        """Runs in the pool."""
+        path = self.cache_file(url)
+        if path.exists():
+            data = path.read_bytes()
+        else:
+            response = self.http.get(url)
+            response.raise_for_status()
+            data = response.content
+            tmp = path.with_name(path.name + ".part")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        image = QImage.fromData(data)
+        if image.isNull():
+            return None
+        return image.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+    def load(self, url: str, size: QSize, callback: Callable[[QPixmap], None]):
+        if not url:
+            return
+        key = (url, size.width(), size.height())
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            callback(QPixmap.fromImage(image))
+            return
+        if key in self._waiting:
+            self._waiting[key].append(callback)
+            return
+
+        self._waiting[key] = [callback]
+        worker = TaskWorker(self.fetch, url, size)
+        worker.signals.finished.connect(lambda image, key=key: self._loaded(key, image))
+        worker.signals.error.connect(lambda _, key=key: self._waiting.pop(key, None))
+        self.pool.start(worker)
+
+    def _loaded(self, key: Key, image: Optional[QImage]):
+        callbacks = self._waiting.pop(key, [])
+        if image is None:
+            return
+        self._images[key] = image
+        while len(self._images) > self.max_images:
+            self._images.popitem(last=False)
+        pixmap = QPixmap.fromImage(image)
+        for callback in callbacks:
+            try:
+                callback(pixmap)
+            except RuntimeError:
+                # The card was cleared by a newer search before its cover arrived
+                pass
@@ -1,65 +1,99 @@
 import sys
 import os
 import re
+import threading
+from collections import deque
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QStackedWidget, QLabel, QLineEdit, 
                              QGridLayout, QScrollArea, QFrame, QProgressBar, 
-                             QTableWidget, QTableWidgetItem, QHeaderView, 
+                             QTableWidget, QTableWidgetItem, QTableView, QHeaderView, 
                              QAbstractItemView, QFileDialog, QSpinBox, QCheckBox, 
                              QComboBox)
-from PyQt6.QtCore import Qt, QSize, QThreadPool, QRunnable, pyqtSignal, QObject, QEvent
-from PyQt6.QtGui import QIcon, QFont, QColor, QPixmap
+from PyQt6.QtCore import Qt, QSize, QThreadPool, QRunnable, QEvent, QTimer
+from PyQt6.QtGui import QIcon, QFont, QColor
 import qtawesome as qta
-import requests
 
 from ..config_manager import ConfigManager
 from ..api_client import AsuraAPI
-from ..downloader import Downloader
+from ..downloader import create_downloader
+from ..http_client import HttpClient
+from ..api_cache import ApiCache
+from ..library import Library
 from ..models import Manga, Chapter
 from .widgets import MangaCard, GlassCard
 
 from .workers import TaskWorker
+from .cover_loader import CoverLoader
+from .chapter_model import ChapterTableModel
 
-class GUIProgressBridge(QObject):
-    task_added = pyqtSignal(int, str, int) # task_id, name, total
-    task_updated = pyqtSignal(int, int) # task_id, advance
-    task_removed = pyqtSignal(int)
+class GUIProgressBridge:
+    """Rich-style progress API for download threads, drained by the GUI on a timer.
+
+    Download threads only bump counters under a lock; the window applies
+    everything that happened since the last tick in one batch, so per-page
+    updates never turn into per-page Qt signals.
+    """
 
     def __init__(self):
-        super().__init__()
         self.tasks = {}
         self.next_id = 0
+        self._lock = threading.Lock()
+        # Adds and removes keep their order so finished rows can be reused within one batch
+        self._events = []
+        self._advances = {}
 
     def add_task(self, description, total=100):
-        task_id = self.next_id
-        self.next_id += 1
-        self.tasks[task_id] = description
-        self.task_added.emit(task_id, description, total)
+        # Downloader descriptions carry Rich markup like "[cyan]"
+        description = re.sub(r"\[/?[a-z ]+\]", "", description)
+        with self._lock:
+            task_id = self.next_id
+            self.next_id += 1
+            self.tasks[task_id] = description
+            self._events.append((task_id, description, total))
         return task_id
 
     def update(self, task_id, advance=0):
-        self.task_updated.emit(task_id, advance)
+        with self._lock:
+            self._advances[task_id] = self._advances.get(task_id, 0) + advance
 
     def remove_task(self, task_id):
-        self.task_removed.emit(task_id)
+        with self._lock:
+            self._events.append((task_id, None, None))
+            self.tasks.pop(task_id, None)
+
+    def drain(self):
+        with self._lock:
+            batch = self._events, self._advances
+            self._events, self._advances = [], {}
+        return batch
+
+PROGRESS_INTERVAL_MS = 66  # ~15 Hz
+MAX_FINISHED_ROWS = 50  # older finished rows are reused for new tasks
 
 class MainWindow(QMainWindow):
     def __init__(self, config_mgr):
         super().__init__()
         self.config_mgr = config_mgr
+        self.http = HttpClient.from_settings(config_mgr.settings)
         self.api = AsuraAPI(
             retry_count=config_mgr.settings.retry_count,
             retry_delay=config_mgr.settings.retry_delay,
-            enable_logging=config_mgr.settings.enable_logging
+            enable_logging=config_mgr.settings.enable_logging,
+            http=self.http,
+            cache=ApiCache.from_settings(config_mgr.settings)
         )
-        self.downloader = Downloader(config_mgr.settings, self.api)
+        self.library = Library.from_settings(config_mgr.settings)
+        self.downloader = create_downloader(config_mgr.settings, self.api, self.http, self.library)
         self.threadpool = QThreadPool()
+        self.active_downloads = 0
+        self.covers = CoverLoader.from_settings(self.http, config_mgr.settings)
         
         self.progress_bridge = GUIProgressBridge()
-        self.progress_bridge.task_added.connect(self.on_task_added)
-        self.progress_bridge.task_updated.connect(self.on_task_updated)
-        self.progress_bridge.task_removed.connect(self.on_task_removed)
         self.task_id_to_row = {}
+        self.finished_rows = deque()
+        self.progress_timer = QTimer(self)
+        self.progress_timer.timeout.connect(self.apply_progress)
+        self.progress_timer.start(PROGRESS_INTERVAL_MS)
         
         self.setWindowTitle("AsuraComic Downloader")
         self.setMinimumSize(1100, 750)
@@ -200,9 +234,32 @@ class MainWindow(QMainWindow):
         if header:
             header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         layout.addWidget(self.progress_table)
+
+        controls = QHBoxLayout()
+        controls.addStretch()
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        controls.addWidget(self.pause_btn)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.cancel_downloads)
+        controls.addWidget(cancel_btn)
+        layout.addLayout(controls)
         
         self.stack.addWidget(tab)
 
+    def toggle_pause(self):
+        if self.downloader.token.paused:
+            self.downloader.resume()
+            self.pause_btn.setText("Pause")
+        else:
+            self.downloader.pause()
+            self.pause_btn.setText("Resume")
+
+    def cancel_downloads(self):
+        # Running jobs stop between chunks; the next download gets a fresh token
+        self.downloader.cancel()
+        self.pause_btn.setText("Pause")
+
     def init_settings_tab(self):
         tab = QWidget()
         layout = QVBoxLayout(tab)
@@ -254,9 +311,46 @@ class MainWindow(QMainWindow):
         self.limit_spin.setValue(settings.chapter_list_limit)
         self.limit_spin.valueChanged.connect(lambda v: self.config_mgr.update_setting("chapter_list_limit", v))
         card_layout.addWidget(self.limit_spin, 4, 1)
+
+        # Row 5: Download Engine
+        card_layout.addWidget(QLabel("Download Engine:"), 5, 0)
+        self.engine_combo = QComboBox()
+        self.engine_combo.addItems(["threads", "async"])
+        self.engine_combo.setCurrentText(settings.download_engine)
+        self.engine_combo.currentTextChanged.connect(self.change_engine)
+        card_layout.addWidget(self.engine_combo, 5, 1)
+
+        # Row 6: Max Concurrent Pages
+        card_layout.addWidget(QLabel("Max Concurrent Pages (0=Auto):"), 6, 0)
+        self.pages_spin = QSpinBox()
+        self.pages_spin.setRange(0, 500)
+        self.pages_spin.setValue(settings.max_concurrent_pages)
+        self.pages_spin.valueChanged.connect(lambda v: self.config_mgr.update_setting("max_concurrent_pages", v))
+        card_layout.addWidget(self.pages_spin, 6, 1)
+
+        # Row 7: PDF Volume Size
+        card_layout.addWidget(QLabel("Chapters per PDF Volume (0=Off):"), 7, 0)
+        self.volume_spin = QSpinBox()
+        self.volume_spin.setRange(0, 500)
+        self.volume_spin.setValue(settings.pdf_volume_size)
+        self.volume_spin.valueChanged.connect(lambda v: self.config_mgr.update_setting("pdf_volume_size", v))
+        card_layout.addWidget(self.volume_spin, 7, 1)
         
         self.stack.addWidget(tab)
 
+    def change_engine(self, engine):
+        # Disabled while downloads run: Pause/Cancel must keep reaching the running job's downloader
+        self.config_mgr.update_setting("download_engine", engine)
+        self.downloader.close()
+        self.downloader = create_downloader(self.config_mgr.settings, self.api, self.http, self.library)
+
+    def closeEvent(self, event):
+        # Running jobs stop between chunks before their packaging pool goes away
+        self.downloader.cancel()
+        self.threadpool.waitForDone()
+        self.downloader.close()
+        super().closeEvent(event)
+
     def perform_search(self):
         query = self.search_input.text()
         if not query: return
@@ -273,7 +367,7 @@ class MainWindow(QMainWindow):
 
     def display_search_results(self, mangas):
         for i, manga in enumerate(mangas):
-            card = MangaCard(manga)
+            card = MangaCard(manga, self.covers)
             card.clicked.connect(self.show_manga_info)
             self.results_grid.addWidget(card, i // 4, i % 4)
 
@@ -301,7 +395,6 @@ class MainWindow(QMainWindow):
         cover_label = QLabel()
         cover_label.setFixedSize(200, 300)
         cover_label.setScaledContents(True)
-        # Load cover again...
         row1.addWidget(cover_label)
         
         details = QVBoxLayout()
@@ -331,13 +424,7 @@ class MainWindow(QMainWindow):
         self.manga_layout.addLayout(row1)
         
         # Load Cover asynchronously
-        cover_worker = TaskWorker(requests.get, manga.cover, timeout=10)
-        def set_cover(res):
-            pix = QPixmap()
-            pix.loadFromData(res.content)
-            cover_label.setPixmap(pix)
-        cover_worker.signals.finished.connect(set_cover)
-        self.threadpool.start(cover_worker)
+        self.covers.load(manga.cover, cover_label.size(), cover_label.setPixmap)
         
         # Fetch chapters
         worker = TaskWorker(self.api.get_chapters, manga.slug)
@@ -349,34 +436,38 @@ class MainWindow(QMainWindow):
     def display_chapters(self, chapters):
         self.chapters = chapters
         
-        # Chapter Table
-        self.chapter_table = QTableWidget(len(chapters), 3)
-        self.chapter_table.setHorizontalHeaderLabels(["Select", "Number", "Title"])
-        self.chapter_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.chapter_table.cellClicked.connect(self.toggle_chapter_cb)
-        
+        # Chapter Table, shown oldest to newest
+        self.chapter_model = ChapterTableModel(chapters)
+        self.chapter_table = QTableView()
+        self.chapter_table.setModel(self.chapter_model)
+        self.chapter_table.clicked.connect(lambda index: self.chapter_model.toggle(index.row()))
+
         header = self.chapter_table.horizontalHeader()
         if header:
+            # Fixed sections: ResizeToContents would measure every row of a long series
             header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
             self.chapter_table.setColumnWidth(0, 50)
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+            self.chapter_table.setColumnWidth(1, 120)
             header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        vertical = self.chapter_table.verticalHeader()
+        if vertical:
+            vertical.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.chapter_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.chapter_table.setMinimumHeight(400) # Ensure it's big enough
 
-        # Show oldest to newest
-        for i, chap in enumerate(chapters):
-            cb_item = QTableWidgetItem()
-            cb_item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-            cb_item.setCheckState(Qt.CheckState.Unchecked)
-            self.chapter_table.setItem(i, 0, cb_item)
-            self.chapter_table.setItem(i, 1, QTableWidgetItem(f"Chapter {chap.number}"))
-            self.chapter_table.setItem(i, 2, QTableWidgetItem(chap.title or ""))
-
         self.manga_layout.addWidget(self.chapter_table)
         
         # Download Controls
         controls = QHBoxLayout()
+        for text, action in [
+            ("All", self.chapter_model.check_all),
+            ("None", self.chapter_model.clear_checks),
+            ("Check Highlighted", self.check_highlighted),
+        ]:
+            btn = QPushButton(text)
+            btn.clicked.connect(action)
+            controls.addWidget(btn)
+
         self.range_input = QLineEdit()
         self.range_input.setPlaceholderText("Range e.g. 1-10, 15 (leave empty for selected above)")
         controls.addWidget(self.range_input)
@@ -388,22 +479,15 @@ class MainWindow(QMainWindow):
         
         self.manga_layout.addLayout(controls)
 
-    def toggle_chapter_cb(self, row, column):
-        item = self.chapter_table.item(row, 0)
-        if item:
-            new_state = Qt.CheckState.Checked if item.checkState() == Qt.CheckState.Unchecked else Qt.CheckState.Unchecked
-            item.setCheckState(new_state)
+    def check_highlighted(self):
+        rows = {index.row() for index in self.chapter_table.selectionModel().selectedRows()}
+        self.chapter_model.set_checked(rows)
 
     def start_download(self):
         range_str = self.range_input.text()
         if not range_str:
             # Get selected from checkboxes
-            selected = []
-            for i in range(self.chapter_table.rowCount()):
-                item = self.chapter_table.item(i, 0)
-                if item and item.checkState() == Qt.CheckState.Checked:
-                    selected.append(self.chapters[i])
-            
+            selected = self.chapter_model.selected_chapters()
             if not selected:
                 return
                 
@@ -411,54 +495,55 @@ class MainWindow(QMainWindow):
         else:
             worker = TaskWorker(self.downloader.download_manga, self.current_manga, range_str, self.progress_bridge, self.progress_bridge)
         
+        worker.signals.finished.connect(self.download_finished)
+        worker.signals.error.connect(self.download_finished)
+        self.active_downloads += 1
+        self.engine_combo.setEnabled(False)
         self.switch_tab(3) # Switch to progress tab
         self.threadpool.start(worker)
 
+    def download_finished(self, _result):
+        self.active_downloads -= 1
+        if not self.active_downloads:
+            self.engine_combo.setEnabled(True)
+
     def download_selected(self, chapters):
-        overall_task = self.progress_bridge.add_task("[Total Progress]", total=len(chapters))
-        
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        
-        with ThreadPoolExecutor(max_workers=self.config_mgr.settings.threads_chapters) as executor:
-            futures = []
-            for chap in chapters:
-                def run_chap(c=chap):
-                    series_slug = c.series_slug or self.current_manga.slug
-                    pages = self.api.get_chapter_images(series_slug, c.slug)
-                    task_id = self.progress_bridge.add_task(f"Chapter {c.number}", total=len(pages))
-                    
-                    self.downloader.download_chapter(
-                        self.current_manga, 
-                        c, 
-                        series_slug, 
-                        lambda n: self.progress_bridge.update(task_id, advance=n)
-                    )
-                    self.progress_bridge.update(overall_task, advance=1)
-                    self.progress_bridge.remove_task(task_id)
-
-                futures.append(executor.submit(run_chap))
-            
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    print(f"Chapter download error: {e}")
+        # Goes through the downloader so the configured engine (threads or async) runs the job
+        self.downloader.download_chapters(self.current_manga, chapters, self.progress_bridge, self.progress_bridge)
+
+    def apply_progress(self):
+        events, advances = self.progress_bridge.drain()
+        if not (events or advances):
+            return
+        self.progress_table.setUpdatesEnabled(False)
+        for task_id, name, total in events:
+            if name is not None:
+                self.on_task_added(task_id, name, total)
+            else:
+                self.on_task_updated(task_id, advances.pop(task_id, 0))
+                self.on_task_removed(task_id)
+        for task_id, advance in advances.items():
+            self.on_task_updated(task_id, advance)
+        self.progress_table.setUpdatesEnabled(True)
 
     def on_task_added(self, task_id, name, total):
-        row = self.progress_table.rowCount()
-        self.progress_table.insertRow(row)
-        
-        self.progress_table.setItem(row, 0, QTableWidgetItem(name))
-        
-        status_item = QTableWidgetItem("Downloading...")
-        self.progress_table.setItem(row, 1, status_item)
-        
-        progress_bar = QProgressBar()
+        if len(self.finished_rows) >= MAX_FINISHED_ROWS:
+            row = self.finished_rows.popleft()
+        else:
+            row = self.progress_table.rowCount()
+            self.progress_table.insertRow(row)
+            self.progress_table.setItem(row, 0, QTableWidgetItem())
+            self.progress_table.setItem(row, 1, QTableWidgetItem())
+            progress_bar = QProgressBar()
+            progress_bar.setFormat("%v/%m (%p%)")
+            self.progress_table.setCellWidget(row, 2, progress_bar)
+
+        self.progress_table.item(row, 0).setText(name)
+        self.progress_table.item(row, 1).setText("Downloading...")
+        progress_bar = self.progress_table.cellWidget(row, 2)
         progress_bar.setMaximum(total)
         progress_bar.setValue(0)
-        progress_bar.setFormat("%v/%m (%p%)")
-        self.progress_table.setCellWidget(row, 2, progress_bar)
-        
+
         self.task_id_to_row[task_id] = row
 
     def on_task_updated(self, task_id, advance):
@@ -473,4 +558,9 @@ class MainWindow(QMainWindow):
                         item.setText("Finished")
 
     def on_task_removed(self, task_id):
-        pass # Optional: remove from table or just keep as "Finished"
+        row = self.task_id_to_row.pop(task_id, None)
+        if row is not None:
+            widget = self.progress_table.cellWidget(row, 2)
+            done = widget.value() >= widget.maximum()
+            self.progress_table.item(row, 1).setText("Finished" if done else "Incomplete")
+            self.finished_rows.append(row)
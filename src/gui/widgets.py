@@ -1,10 +1,5 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QFrame
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QPixmap
-import requests
-from io import BytesIO
-from PyQt6.QtCore import QThreadPool
-from .workers import TaskWorker
 
 class GlassCard(QFrame):
     def __init__(self, parent=None):
@@ -15,7 +10,7 @@ class GlassCard(QFrame):
 class MangaCard(GlassCard):
     clicked = pyqtSignal(object)
 
-    def __init__(self, manga, parent=None):
+    def __init__(self, manga, cover_loader, parent=None):
         super().__init__(parent)
         self.manga = manga
         self.main_layout = QVBoxLayout(self)
@@ -36,14 +31,7 @@ class MangaCard(GlassCard):
         self.main_layout.addStretch()
         
         # Load cover asynchronously
-        worker = TaskWorker(requests.get, manga.cover, timeout=10)
-        def on_loaded(res):
-            pix = QPixmap()
-            pix.loadFromData(res.content)
-            self.cover_label.setPixmap(pix)
-            
-        worker.signals.finished.connect(on_loaded)
-        QThreadPool.globalInstance().start(worker)
+        cover_loader.load(manga.cover, self.cover_label.size(), self.cover_label.setPixmap)
 
     def mousePressEvent(self, a0):
         self.clicked.emit(self.manga)
@@ -0,0 +1,79 @@
+import threading
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .limiter import HostLimiters, Slot
+
+if TYPE_CHECKING:
+    from .cancellation import CancelToken
+
+
+class HttpClient:
+    """Shared keep-alive transport used by both AsuraAPI and Downloader."""
+
+    def __init__(self, pool_size: int = 10, max_hosts: int = 16, connect_timeout: float = 5.0, read_timeout: float = 10.0, initial_per_host: int = 5, adaptive: bool = True):
+        self.pool_size = pool_size
+        # API and image CDN are different hosts, so each gets its own limit
+        self.limiters = HostLimiters(initial_per_host, pool_size, adaptive)
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        # pool_block keeps us at pool_size sockets per host instead of opening throwaway extras
+        self.adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings) -> "HttpClient":
+        pool_size = settings.max_connections_per_host
+        if pool_size <= 0:
+            # Every page worker may hold a CDN socket, every chapter worker an API socket
+            page_workers = settings.max_concurrent_pages or settings.threads_chapters * settings.threads_images
+            pool_size = page_workers + settings.threads_chapters
+        return cls(
+            pool_size=pool_size,
+            connect_timeout=settings.connect_timeout,
+            read_timeout=settings.read_timeout,
+            initial_per_host=settings.threads_images,
+            adaptive=settings.adaptive_concurrency,
+        )
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def slot(self, url: str, token: Optional["CancelToken"] = None) -> Slot:
+        return self.limiters.slot(url, token)
+
+    async def slot_async(self, url: str, token: Optional["CancelToken"] = None) -> Slot:
+        return await self.limiters.slot_async(url, token)
+
+    def stats(self) -> dict:
+        pools = self.adapter.poolmanager.pools
+        per_host = {}
+        with self._lock:
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = per_host.setdefault(pool.host, {"requests": 0, "connections": 0})
+                host["requests"] += pool.num_requests
+                host["connections"] += pool.num_connections
+        total_requests = sum(h["requests"] for h in per_host.values())
+        total_connections = sum(h["connections"] for h in per_host.values())
+        return {
+            "requests": total_requests,
+            "connections": total_connections,
+            "reused": max(total_requests - total_connections, 0),
+            "hosts": per_host,
+            "limits": self.limiters.limits(),
+        }
+
+    def close(self):
+        self.session.close()
+
@@ -0,0 +1,69 @@
+from typing import BinaryIO, Optional
+
+SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+)
+# Lost with the end of a truncated body even when the server announced no length
+TRAILERS = {"JPEG": b"\xff\xd9", "PNG": b"IEND"}
+TAIL_SIZE = 32
+# CDNs may serve a downscaled copy; only a different shape means a different picture
+ASPECT_TOLERANCE = 0.01
+
+
+class CorruptPage(IOError):
+    """A page body that arrived in full but isn't the image it should be."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def sniff(head: bytes) -> Optional[str]:
+    for signature, fmt in SIGNATURES:
+        if head.startswith(signature):
+            return fmt
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "AVIF"
+    return None
+
+
+def verify_image(fp: BinaryIO, size: int, width: int = 0, height: int = 0) -> str:
+    """Check magic bytes, end marker and header dimensions without decoding any pixels; returns the format."""
+    if size == 0:
+        raise CorruptPage("empty", "empty body")
+    head = fp.read(16)
+    fmt = sniff(head)
+    if fmt is None:
+        # Typically an HTML error page sent with status 200
+        raise CorruptPage("format", f"not an image, starts with {head[:8]!r}")
+
+    trailer = TRAILERS.get(fmt)
+    if trailer is not None:
+        fp.seek(max(0, size - TAIL_SIZE))
+        if trailer not in fp.read():
+            raise CorruptPage("truncated", f"{fmt} end marker missing")
+    if fmt == "WEBP" and int.from_bytes(head[4:8], "little") + 8 != size:
+        # WebP has no end marker, but its RIFF header records the file length
+        raise CorruptPage("truncated", f"RIFF length {int.from_bytes(head[4:8], 'little') + 8}, got {size} bytes")
+
+    if fmt == "AVIF":
+        # Pillow needs a plugin for AVIF headers
+        return fmt
+    from PIL import Image
+
+    fp.seek(0)
+    try:
+        # Image.open only parses the header; pixels are decoded on load(), which never happens here
+        with Image.open(fp) as img:
+            actual_width, actual_height = img.size
+    except Exception as e:
+        raise CorruptPage("header", f"unreadable {fmt} header: {e}")
+    if width and height and (actual_width, actual_height) != (width, height):
+        if abs(actual_width * height - actual_height * width) > ASPECT_TOLERANCE * actual_height * width:
+            raise CorruptPage("dimensions", f"{actual_width}x{actual_height}, expected {width}x{height}")
+    return fmt
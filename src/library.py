@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Set
+
+from .models import Manga, Chapter
+
+
+class Library:
+    """SQLite index of the series and chapters that have been downloaded."""
+
+    def __init__(self, path: Path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS series (
+                slug TEXT PRIMARY KEY,
+                id INTEGER,
+                title TEXT NOT NULL,
+                last_chapter_at TEXT,
+                tracked INTEGER NOT NULL DEFAULT 1,
+                synced_at REAL,
+                synced_number REAL
+            );
+            CREATE TABLE IF NOT EXISTS chapters (
+                series_slug TEXT NOT NULL,
+                chapter_id INTEGER NOT NULL,
+                number REAL NOT NULL,
+                format TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                downloaded_at REAL NOT NULL,
+                PRIMARY KEY (series_slug, chapter_id)
+            );
+            """
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(series)")}
+        if "synced_number" not in columns:
+            # Libraries created before sync remembered how far it got
+            self._db.execute("ALTER TABLE series ADD COLUMN synced_number REAL")
+        self._db.commit()
+
+    @classmethod
+    def from_settings(cls, settings) -> "Library":
+        return cls(Path(settings.library_path))
+
+    def add_series(self, manga: Manga):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO series (slug, id, title) VALUES (?, ?, ?) "
+                "ON CONFLICT(slug) DO UPDATE SET id = excluded.id, title = excluded.title",
+                (manga.slug, manga.id, manga.title),
+            )
+            self._db.commit()
+
+    def record_chapter(self, manga: Manga, chapter: Chapter, fmt: str, path: Path, size: int):
+        self.add_series(manga)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO chapters VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (manga.slug, chapter.id, chapter.number, fmt, str(path), size, time.time()),
+            )
+            self._db.commit()
+
+    def mark_synced(self, manga: Manga, number: Optional[float]):
+        """Remember the series as up to date through chapter `number`."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE series SET last_chapter_at = ?, synced_at = ?, synced_number = ? WHERE slug = ?",
+                (manga.last_chapter_at, time.time(), number, manga.slug),
+            )
+            self._db.commit()
+
+    def set_tracked(self, slug: str, tracked: bool) -> bool:
+        """False if the series isn't in the library."""
+        with self._lock:
+            cursor = self._db.execute("UPDATE series SET tracked = ? WHERE slug = ?", (int(tracked), slug))
+            self._db.commit()
+        return cursor.rowcount > 0
+
+    def tracked_series(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT slug FROM series WHERE tracked = 1 ORDER BY title").fetchall()
+        return [row[0] for row in rows]
+
+    def last_chapter_at(self, slug: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT last_chapter_at FROM series WHERE slug = ?", (slug,)).fetchone()
+        return row[0] if row else None
+
+    def downloaded_ids(self, slug: str) -> Set[int]:
+        with self._lock:
+            rows = self._db.execute("SELECT chapter_id FROM chapters WHERE series_slug = ?", (slug,)).fetchall()
+        return {row[0] for row in rows}
+
+    def has_chapter(self, slug: str, chapter_id: int) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM chapters WHERE series_slug = ? AND chapter_id = ?", (slug, chapter_id)
+            ).fetchone()
+        return row is not None
+
+    def sync_baseline(self, slug: str) -> Optional[float]:
+        # The last sync's high-water mark, else the highest chapter ever downloaded
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COALESCE(s.synced_number, MAX(c.number)) FROM series s "
+                "LEFT JOIN chapters c ON c.series_slug = s.slug WHERE s.slug = ?",
+                (slug,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def missing_chapters(self, manga: Manga, chapters: List[Chapter]) -> List[Chapter]:
+        """Chapters released after the baseline that aren't downloaded yet.
+
+        Older gaps are left alone, so sampling one chapter of a series never
+        turns into a download of its whole back catalog.
+        """
+        have = self.downloaded_ids(manga.slug)
+        baseline = self.sync_baseline(manga.slug)
+        return [c for c in chapters if c.id not in have and (baseline is None or c.number > baseline)]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
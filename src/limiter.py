@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from .cancellation import Cancelled, CancelToken
+from .metrics import METRICS
+
+THROTTLE_STATUSES = (429, 503)
+# A single response must not park every worker of a host for hours
+MAX_RETRY_AFTER = 300.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    try:
+        return min(max(0.0, parsedate_to_datetime(value).timestamp() - time.time()), MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for a single host.
+
+    Each healthy response adds roughly one slot per window of requests, while
+    429/503 halves the limit and pauses the host for Retry-After. Latency that
+    drifts well above the best seen so far stops the ramp before errors start.
+    """
+
+    LATENCY_TOLERANCE = 2.0
+
+    def __init__(self, initial: int, maximum: int, adaptive: bool = True, host: str = ""):
+        self.host = host
+        self.maximum = max(1, maximum)
+        self.limit = float(min(max(1, initial), self.maximum)) if adaptive else float(self.maximum)
+        self.adaptive = adaptive
+        self.inflight = 0
+        self.blocked_until = 0.0
+        self._latency: Optional[float] = None
+        self._best_latency: Optional[float] = None
+        self._cond = threading.Condition()
+
+    def _can_start(self, now: float) -> bool:
+        return now >= self.blocked_until and self.inflight < int(self.limit)
+
+    def try_acquire(self) -> float:
+        """Take a slot and return 0, or return how long to wait before trying again."""
+        with self._cond:
+            now = time.monotonic()
+            if self._can_start(now):
+                self.inflight += 1
+                return 0.0
+            return max(self.blocked_until - now, 0.02)
+
+    def acquire(self, token: Optional[CancelToken] = None):
+        with self._cond:
+            while True:
+                if token is not None:
+                    token.check()
+                now = time.monotonic()
+                if self._can_start(now):
+                    self.inflight += 1
+                    return
+                wait = max(self.blocked_until - now, 0.05)
+                # Short waits so a cancel is noticed even while the host is paused for Retry-After
+                self._cond.wait(min(wait, token.POLL) if token is not None else wait)
+
+    def release(self, latency: float, status: Optional[int], retry_after: Optional[float] = None):
+        with self._cond:
+            self.inflight -= 1
+            if status in THROTTLE_STATUSES:
+                if self.adaptive:
+                    self.limit = max(1.0, self.limit / 2)
+                self.blocked_until = max(self.blocked_until, time.monotonic() + (retry_after or 1.0))
+            elif self.adaptive:
+                if status is None or status >= 500:
+                    self.limit = max(1.0, self.limit * 0.75)
+                else:
+                    self._observe_latency(latency)
+            self._cond.notify_all()
+
+    def _observe_latency(self, latency: float):
+        self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+        if self._best_latency is None or self._latency < self._best_latency:
+            self._best_latency = self._latency
+        if self._latency <= self._best_latency * self.LATENCY_TOLERANCE:
+            self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+        else:
+            self.limit = max(1.0, self.limit - 1.0 / self.limit)
+
+
+class Slot:
+    """One in-flight request against a host's limiter; call observe() with the response.
+
+    Callers add body bytes to `received`; the request is recorded in METRICS on exit.
+    """
+
+    def __init__(self, limiter: AdaptiveLimiter):
+        self.limiter = limiter
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+        self.received = 0
+        self._started = time.monotonic()
+
+    def observe(self, response):
+        self.status = response.status_code
+        self.retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+    @property
+    def throttled(self) -> bool:
+        return self.status in THROTTLE_STATUSES
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        status = self.status
+        if exc_type is not None and status is not None and status < 400 and not issubclass(exc_type, Cancelled):
+            # Headers arrived fine but the body didn't: that is a transport error
+            status = None
+        latency = time.monotonic() - self._started
+        self.limiter.release(latency, status, self.retry_after)
+        METRICS.record_request(self.limiter.host, status, latency, self.received)
+
+
+class HostLimiters:
+    def __init__(self, initial: int, maximum: int, adaptive: bool = True):
+        self.initial = initial
+        self.maximum = maximum
+        self.adaptive = adaptive
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> AdaptiveLimiter:
+        host = urlsplit(url).netloc
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = AdaptiveLimiter(self.initial, self.maximum, self.adaptive, host)
+            return limiter
+
+    def slot(self, url: str, token: Optional[CancelToken] = None) -> Slot:
+        """Wait for a slot on the URL's host; raises Cancelled if the token is cancelled meanwhile."""
+        limiter = self.for_url(url)
+        limiter.acquire(token)
+        return Slot(limiter)
+
+    async def slot_async(self, url: str, token: Optional[CancelToken] = None) -> Slot:
+        limiter = self.for_url(url)
+        while True:
+            if token is not None:
+                token.check()
+            wait = limiter.try_acquire()
+            if not wait:
+                return Slot(limiter)
+            await asyncio.sleep(min(wait, token.POLL) if token is not None else wait)
+
+    def limits(self) -> Dict[str, float]:
+        with self._lock:
+            return {host: round(limiter.limit, 2) for host, limiter in self._limiters.items()}
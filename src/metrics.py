@@ -0,0 +1,205 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Seconds; covers a cached API hit up to a slow page on a throttled CDN
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+HELP = {
+    "asura_requests_total": "HTTP responses (or transport errors) by host and status",
+    "asura_request_seconds": "Time per HTTP request including the body",
+    "asura_bytes_total": "Response bytes received",
+    "asura_retries_total": "API requests and pages retried after a failed attempt",
+    "asura_failures_total": "API requests and pages that failed after every retry, by last status",
+    "asura_api_cache_total": "API cache lookups by result",
+    "asura_pages_total": "Pages by where their bytes came from",
+    "asura_corrupt_pages_total": "Page bodies rejected by the integrity checks and fetched again, by reason",
+    "asura_stage_seconds": "Time spent per pipeline stage",
+}
+
+
+def label_key(labels: dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+def finite(value: Optional[float]):
+    # JSON has no infinity
+    return "+Inf" if value == float("inf") else value
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile; inf past the last bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """In-process counters and histograms: a dict update under one lock per event.
+
+    Exported as a JSON summary, a Prometheus textfile or a /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("asura_stage_seconds", time.perf_counter() - started, stage=stage)
+
+    def record_request(self, host: str, status: Optional[int], seconds: float, size: int = 0):
+        # By host, which is what separates the API from the image CDN
+        self.inc("asura_requests_total", host=host, status=status or "error")
+        self.observe("asura_request_seconds", seconds, host=host)
+        if size:
+            self.inc("asura_bytes_total", size, host=host)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def summary(self) -> dict:
+        with self._lock:
+            counters = {f"{name}{format_labels(labels)}": value for (name, labels), value in sorted(self.counters.items())}
+            histograms = {
+                f"{name}{format_labels(labels)}": {
+                    "count": h.count,
+                    "sum": round(h.sum, 3),
+                    "p50": finite(h.quantile(0.5)),
+                    "p99": finite(h.quantile(0.99)),
+                }
+                for (name, labels), h in sorted(self.histograms.items())
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def prometheus(self) -> str:
+        lines: List[str] = []
+        described = set()
+
+        def describe(name: str, kind: str):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                describe(name, "counter")
+                lines.append(f"{name}{format_labels(labels)} {value:g}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                describe(name, "histogram")
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float("inf"),), h.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {h.sum:.6f}")
+                lines.append(f"{name}_count{format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path):
+        # node_exporter's textfile collector must never see a half-written file
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.prometheus())
+        os.replace(tmp, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def start_exporters(self, settings, interval: float = 15.0) -> Callable[[], None]:
+        """Start the exporters enabled in settings; the returned function writes the final textfile and stops them."""
+        server = self.serve(settings.metrics_port) if settings.metrics_port else None
+        textfile = Path(settings.metrics_textfile) if settings.metrics_textfile else None
+        stop = threading.Event()
+
+        def write_periodically():
+            while not stop.wait(interval):
+                self.write_textfile(textfile)
+
+        if textfile is not None:
+            threading.Thread(target=write_periodically, daemon=True).start()
+
+        def shutdown():
+            stop.set()
+            if textfile is not None:
+                self.write_textfile(textfile)
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        return shutdown
+
+
+# One registry per process, like logging: every layer records into it without extra wiring
+METRICS = Metrics()
@@ -1,16 +1,22 @@
-from pydantic import BaseModel, Field
+import sys
+from pydantic import BaseModel, Field, TypeAdapter
+from pydantic.dataclasses import dataclass
 from typing import List, Optional
 
+# Listings run to thousands of chapters: slotted instances skip the per-object __dict__ (Python 3.10+)
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 class Genre(BaseModel):
     id: int
     name: str
     slug: str
 
-class Chapter(BaseModel):
+@dataclass(**SLOTS)
+class Chapter:
     id: int
     number: float
-    title: Optional[str] = None
     slug: str
+    title: Optional[str] = None
     page_count: int = 0
     series_slug: Optional[str] = None
 
@@ -36,7 +42,8 @@ class Manga(BaseModel):
     public_url: str = ""
     source_url: Optional[str] = ""
 
-class Page(BaseModel):
+@dataclass(**SLOTS)
+class Page:
     url: str
     width: int = 0
     height: int = 0
@@ -44,3 +51,8 @@ class Page(BaseModel):
 class ChapterImages(BaseModel):
     chapter: Chapter
     pages: List[Page]
+
+# Whole listings are validated in one call rather than one model at a time
+MangaList = TypeAdapter(List[Manga])
+ChapterList = TypeAdapter(List[Chapter])
+PageList = TypeAdapter(List[Page])
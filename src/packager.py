@@ -0,0 +1,34 @@
+import os
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, List
+
+from .pdf_writer import write_pdf
+from .scheduler import BoundedExecutor, process_pool, shutdown_process_pool
+
+
+class Packager:
+    """Packaging stage shared by every job, so chapter workers only ever wait on the network.
+
+    Archives and cleanup run on a bounded thread pool; PDF builds, which decode
+    and compress non-JPEG pages, go on to the shared process pool so they never
+    compete with the download threads for the GIL. At most one build per
+    packaging thread is in the pool at a time.
+    """
+
+    def __init__(self, workers: int = 0, backlog: int = 0):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        # backlog = chapters allowed to wait behind the ones being packaged
+        self.backlog = backlog
+        self._threads = BoundedExecutor(self.workers, self.workers + backlog, "packaging")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Blocks while the backlog is full, which is what slows downloads to packaging speed."""
+        return self._threads.submit(fn, *args, **kwargs)
+
+    def write_pdf(self, path: Path, images: List[Path]):
+        process_pool().submit(write_pdf, path, images).result()
+
+    def shutdown(self):
+        self._threads.shutdown()
+        shutdown_process_pool()
@@ -0,0 +1,184 @@
+import io
+import os
+import threading
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+from .chapter_state import ChapterState
+from .page_store import PageStore
+
+
+def part_path(path: Path) -> Path:
+    return path.with_name(path.name + ".part")
+
+
+class DirectorySink:
+    """Stores each page as its own file inside the chapter folder.
+
+    Progress is recorded in a ChapterState so a later run can keep finished
+    pages and continue partial ones from the size of their .part file.
+    With a PageStore, known URLs are hardlinked from the store and, when
+    `populate` is set, finished pages are moved into it and linked back.
+    """
+
+    def __init__(self, folder: Path, store: Optional[PageStore] = None, populate: bool = False):
+        self.folder = folder
+        self.state = ChapterState.load(folder)
+        self.store = store
+        self.populate = populate and store is not None
+        self.files: List[Path] = []
+        self.failed = 0
+        self.corrupt = 0
+        self._lock = threading.Lock()
+
+    def is_complete(self, name: str, url: str) -> bool:
+        entry = self.state.page(name, url)
+        path = self.folder / name
+        return bool(entry and entry.get("done")) and path.exists() and path.stat().st_size == entry.get("size")
+
+    def keep(self, index: int, name: str):
+        with self._lock:
+            self.files.append(self.folder / name)
+
+    def from_store(self, index: int, name: str, url: str) -> bool:
+        blob = self.store.lookup(url) if self.store else None
+        if blob is None:
+            return False
+        path = self.folder / name
+        try:
+            PageStore.link(blob, path)
+        except OSError:
+            return False
+        part_path(path).unlink(missing_ok=True)
+        size = path.stat().st_size
+        self.state.expect(name, url, size)
+        self.state.mark_done(name, size)
+        self.keep(index, name)
+        return True
+
+    def resume_offset(self, name: str, url: str) -> int:
+        part = part_path(self.folder / name)
+        if self.state.page(name, url) is None or not part.exists():
+            return 0
+        return part.stat().st_size
+
+    def expect(self, name: str, url: str, size: Optional[int]):
+        self.state.expect(name, url, size)
+
+    def open(self, name: str, offset: int = 0) -> BinaryIO:
+        return open(part_path(self.folder / name), "ab" if offset else "wb")
+
+    def commit(self, index: int, name: str, handle: BinaryIO):
+        handle.close()
+        path = self.folder / name
+        part = part_path(path)
+        size = part.stat().st_size
+        expected = self.state.data["pages"].get(name, {}).get("size")
+        if expected is not None and size != expected:
+            part.unlink(missing_ok=True)
+            raise IOError(f"{name}: got {size} bytes, expected {expected}")
+        # Only complete files ever carry the final name
+        url = self.state.data["pages"].get(name, {}).get("url")
+        if self.populate and url:
+            PageStore.link(self.store.add(url, part), path)
+        else:
+            os.replace(part, path)
+        self.state.mark_done(name, size)
+        with self._lock:
+            self.files.append(path)
+
+    def reader(self, name: str, handle: BinaryIO) -> BinaryIO:
+        handle.flush()
+        return open(part_path(self.folder / name), "rb")
+
+    def reject(self, name: str):
+        # A bad body must not be resumed from
+        part_path(self.folder / name).unlink(missing_ok=True)
+        with self._lock:
+            self.corrupt += 1
+
+    def discard(self, name: str):
+        # Unlike reject(), nothing was wrong with the bytes; they just can't be resumed from
+        part_path(self.folder / name).unlink(missing_ok=True)
+
+    def skip(self, index: int, name: str):
+        # The .part file stays behind so the next run can resume it
+        with self._lock:
+            self.failed += 1
+
+    def flush(self):
+        self.state.flush()
+
+
+class CbzSink:
+    """Writes downloaded pages straight into a CBZ without touching the chapter folder.
+
+    Pages are written as they finish, so only the pages still in flight are
+    held in memory. Entries end up in completion order; readers sort pages by
+    their zero-padded names.
+    """
+
+    def __init__(self, output_file: Path, store: Optional[PageStore] = None):
+        self.output_file = output_file
+        self.store = store
+        self._part = part_path(output_file)
+        self._zip = zipfile.ZipFile(self._part, "w", compression=zipfile.ZIP_STORED)
+        self.failed = 0
+        self.corrupt = 0
+        self._lock = threading.Lock()
+
+    def is_complete(self, name: str, url: str) -> bool:
+        return False
+
+    def from_store(self, index: int, name: str, url: str) -> bool:
+        blob = self.store.lookup(url) if self.store else None
+        if blob is None:
+            return False
+        try:
+            data = blob.read_bytes()
+        except OSError:
+            return False
+        self.commit(index, name, io.BytesIO(data))
+        return True
+
+    def resume_offset(self, name: str, url: str) -> int:
+        return 0
+
+    def expect(self, name: str, url: str, size: Optional[int]):
+        pass
+
+    def open(self, name: str, offset: int = 0) -> BinaryIO:
+        return io.BytesIO()
+
+    def commit(self, index: int, name: str, handle: BinaryIO):
+        with self._lock:
+            self._zip.writestr(name, handle.getvalue())
+
+    def reader(self, name: str, handle: BinaryIO) -> BinaryIO:
+        return io.BytesIO(handle.getvalue())
+
+    def reject(self, name: str):
+        with self._lock:
+            self.corrupt += 1
+
+    def discard(self, name: str):
+        pass
+
+    def skip(self, index: int, name: str):
+        with self._lock:
+            self.failed += 1
+
+    def flush(self):
+        pass
+
+    def close(self, comic_info: str):
+        with self._lock:
+            self._zip.writestr("ComicInfo.xml", comic_info)
+            self._zip.close()
+        os.replace(self._part, self.output_file)
+
+    def abort(self):
+        with self._lock:
+            self._zip.close()
+        self._part.unlink(missing_ok=True)
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PageStore:
+    """Content-addressed store of page images shared by every chapter.
+
+    Blobs live at <root>/<sha[:2]>/<sha> and chapter folders get hardlinks to
+    them, so a credit page that appears in 300 chapters is stored once. An
+    index maps page URLs to blobs so known URLs are never fetched again.
+    Blobs are never modified in place; prune() deletes the ones no chapter
+    links to any more.
+    """
+
+    # Blobs this recent may be waiting for their first hardlink
+    PRUNE_GRACE = 3600
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(root / "index.sqlite3"), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, sha256 TEXT NOT NULL)")
+        self._db.commit()
+
+    def blob_path(self, sha: str) -> Path:
+        return self.root / sha[:2] / sha
+
+    def lookup(self, url: str) -> Optional[Path]:
+        with self._lock:
+            row = self._db.execute("SELECT sha256 FROM urls WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        blob = self.blob_path(row[0])
+        return blob if blob.exists() else None
+
+    def add(self, url: str, path: Path) -> Path:
+        """Move a finished download into the store and return its blob; duplicates are dropped."""
+        sha = file_digest(path)
+        blob = self.blob_path(sha)
+        if blob.exists():
+            path.unlink()
+        else:
+            blob.parent.mkdir(exist_ok=True)
+            os.replace(path, blob)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?)", (url, sha))
+            self._db.commit()
+        return blob
+
+    def prune(self) -> Tuple[int, int]:
+        """Delete blobs only the store still links to; returns (blobs, bytes) removed.
+
+        Where the store had to fall back to copies, blobs are always unlinked
+        elsewhere, so this only drops them from the index; chapters keep their copies.
+        """
+        removed = freed = 0
+        cutoff = time.time() - self.PRUNE_GRACE
+        for blob in self.root.glob("??/*"):
+            st = blob.stat()
+            if st.st_nlink > 1 or st.st_ctime > cutoff:
+                continue
+            blob.unlink()
+            removed += 1
+            freed += st.st_size
+        with self._lock:
+            shas = [row[0] for row in self._db.execute("SELECT DISTINCT sha256 FROM urls").fetchall()]
+            gone = [(sha,) for sha in shas if not self.blob_path(sha).exists()]
+            self._db.executemany("DELETE FROM urls WHERE sha256 = ?", gone)
+            self._db.commit()
+        return removed, freed
+
+    @staticmethod
+    def link(blob: Path, dest: Path):
+        tmp = dest.with_name(dest.name + ".link")
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            # Different filesystem or no hardlink support
+            shutil.copyfile(blob, tmp)
+        os.replace(tmp, dest)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,137 @@
+import os
+import zlib
+from pathlib import Path
+from typing import List
+
+from .packaging import part_path
+
+DPI = 96.0  # Same default img2pdf uses for images without resolution info
+CHUNK_SIZE = 64 * 1024
+
+COLOR_SPACES = {"L": "/DeviceGray", "RGB": "/DeviceRGB", "CMYK": "/DeviceCMYK"}
+
+
+class StreamingPdfWriter:
+    """Writes a PDF one page at a time, keeping only object offsets in memory.
+
+    JPEG pages are embedded as-is (DCTDecode), so they are copied from disk in
+    chunks without decoding. Other formats (webp, png, ...) are decoded and
+    embedded losslessly (FlateDecode), one page at a time.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._part = part_path(path)
+        self._f = open(self._part, "wb")
+        self._offsets = {}
+        self._pages: List[int] = []
+        # 1 = catalog, 2 = page tree; both are written last
+        self._next_id = 3
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _new_id(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _begin(self, obj_id: int):
+        self._offsets[obj_id] = self._f.tell()
+        self._f.write(f"{obj_id} 0 obj\n".encode())
+
+    def _write_object(self, obj_id: int, body: str):
+        self._begin(obj_id)
+        self._f.write(body.encode() + b"\nendobj\n")
+
+    def _write_jpeg(self, obj_id: int, image_path: Path, mode: str, width: int, height: int):
+        # Adobe CMYK JPEGs are stored inverted
+        decode = " /Decode [1 0 1 0 1 0 1 0]" if mode == "CMYK" else ""
+        self._begin(obj_id)
+        self._f.write(
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {COLOR_SPACES[mode]} /BitsPerComponent 8{decode} "
+            f"/Filter /DCTDecode /Length {os.path.getsize(image_path)} >>\nstream\n".encode()
+        )
+        with open(image_path, "rb") as src:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                self._f.write(chunk)
+        self._f.write(b"\nendstream\nendobj\n")
+
+    def _write_flate(self, obj_id: int, img, width: int, height: int):
+        mode = "L" if img.mode in ("1", "L", "LA") else "RGB"
+        pixels = memoryview(img.convert(mode).tobytes())
+        # The compressed size is only known afterwards, so /Length points at an object written last
+        length_id = self._new_id()
+        self._begin(obj_id)
+        self._f.write(
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {COLOR_SPACES[mode]} /BitsPerComponent 8 "
+            f"/Filter /FlateDecode /Length {length_id} 0 R >>\nstream\n".encode()
+        )
+        start = self._f.tell()
+        compressor = zlib.compressobj()
+        for offset in range(0, len(pixels), CHUNK_SIZE):
+            self._f.write(compressor.compress(pixels[offset:offset + CHUNK_SIZE]))
+        self._f.write(compressor.flush())
+        length = self._f.tell() - start
+        self._f.write(b"\nendstream\nendobj\n")
+        self._write_object(length_id, str(length))
+
+    def add_image(self, image_path: Path):
+        from PIL import Image
+
+        image_id, content_id, page_id = self._new_id(), self._new_id(), self._new_id()
+        with Image.open(image_path) as img:
+            width, height = img.size
+            if img.format == "JPEG" and img.mode in COLOR_SPACES:
+                self._write_jpeg(image_id, image_path, img.mode, width, height)
+            else:
+                self._write_flate(image_id, img, width, height)
+
+        page_w = width * 72.0 / DPI
+        page_h = height * 72.0 / DPI
+        content = f"q {page_w:.4f} 0 0 {page_h:.4f} 0 0 cm /Im0 Do Q".encode()
+        self._begin(content_id)
+        self._f.write(f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream\nendobj\n")
+
+        self._write_object(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_w:.4f} {page_h:.4f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>",
+        )
+        self._pages.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{p} 0 R" for p in self._pages)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>")
+        self._write_object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self._f.tell()
+        size = self._next_id
+        self._f.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode())
+        for obj_id in range(1, size):
+            self._f.write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode())
+        self._f.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+        self._f.close()
+        os.replace(self._part, self.path)
+
+    def abort(self):
+        self._f.close()
+        self._part.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_pdf(path: Path, images: List[Path]):
+    with StreamingPdfWriter(path) as writer:
+        for image in images:
+            writer.add_image(image)
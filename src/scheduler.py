@@ -0,0 +1,163 @@
+import asyncio
+import itertools
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def process_pool():
+    """Process pool shared by the CPU-bound stages (PDF builds, transcoding).
+
+    One process per core for all of them together; each stage bounds its own
+    share of the pool by how many jobs it keeps submitted.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: forking a process that already runs download threads is unsafe
+            _process_pool = ProcessPoolExecutor(os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+class PageScheduler:
+    """One shared pool of page workers fed by a priority queue.
+
+    Jobs are ordered by (group, index), where a group is a chapter. Groups are
+    handed out in submission order, so the oldest chapter's pages always run
+    first and idle workers move on to the next chapter instead of sitting in a
+    per-chapter pool.
+    """
+
+    _STOP = object()
+
+    def __init__(self, max_workers: int):
+        self._queue = queue.PriorityQueue()
+        self._groups = itertools.count()
+        self._tiebreak = itertools.count()
+        self._lock = threading.Lock()
+        self._workers = 0
+        self.set_max_workers(max_workers)
+
+    def next_group(self) -> int:
+        return next(self._groups)
+
+    def submit(self, group: int, index: int, fn: Callable, *args, **kwargs) -> Future:
+        future = Future()
+        self._queue.put((group, index, next(self._tiebreak), future, fn, args, kwargs))
+        return future
+
+    def set_max_workers(self, max_workers: int):
+        max_workers = max(1, max_workers)
+        with self._lock:
+            while self._workers < max_workers:
+                threading.Thread(target=self._work, name="page-worker", daemon=True).start()
+                self._workers += 1
+            while self._workers > max_workers:
+                # Stop markers sort ahead of every job so surplus workers exit promptly
+                self._queue.put((-1, -1, next(self._tiebreak), None, self._STOP, (), {}))
+                self._workers -= 1
+
+    @property
+    def max_workers(self) -> int:
+        return self._workers
+
+    def _work(self):
+        while True:
+            _, _, _, future, fn, args, kwargs = self._queue.get()
+            if fn is self._STOP:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class BoundedExecutor:
+    """Thread pool whose submit() blocks while `bound` jobs are already queued or running.
+
+    Sits between pipeline stages so a slow stage pushes back on the one feeding it
+    instead of letting finished work pile up in memory.
+    """
+
+    def __init__(self, max_workers: int, bound: int, name: str = "worker"):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max(1, bound))
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+class AsyncPageScheduler:
+    """Event-loop counterpart of PageScheduler used by the async engine."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._groups = itertools.count()
+        self._tiebreak = itertools.count()
+        self._tasks = []
+
+    async def __aenter__(self):
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.max_workers)]
+        return self
+
+    async def __aexit__(self, *exc):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def next_group(self) -> int:
+        return next(self._groups)
+
+    def submit(self, group: int, index: int, fn: Callable, *args) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((group, index, next(self._tiebreak), future, fn, args))
+        return future
+
+    async def _work(self):
+        while True:
+            _, _, _, future, fn, args = await self._queue.get()
+            if future.cancelled():
+                continue
+            try:
+                result = await fn(*args)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
@@ -0,0 +1,81 @@
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List, NamedTuple
+
+from .scheduler import process_pool
+
+EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "AVIF": "avif"}
+
+
+class TranscodeOptions(NamedTuple):
+    format: str = ""  # "" keeps the format the CDN served
+    width: int = 0  # 0 keeps the original width
+    quality: int = 85
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.format) or self.width > 0
+
+
+def transcode_file(path: str, options: TranscodeOptions) -> str:
+    """Runs in a worker process: re-encode/downscale one page and return its new path."""
+    from PIL import Image
+
+    src = Path(path)
+    with Image.open(src) as img:
+        target_format = options.format or img.format
+        needs_resize = options.width > 0 and img.width > options.width
+        if target_format == img.format and not needs_resize:
+            return path
+
+        if needs_resize:
+            height = round(img.height * options.width / img.width)
+            img = img.resize((options.width, height), Image.Resampling.LANCZOS)
+        if target_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        ext = EXTENSIONS.get(target_format, src.suffix.lstrip("."))
+        dest = src.with_suffix(f".{ext}")
+        tmp = dest.with_name(dest.name + ".part")
+        save_args = {"quality": options.quality} if target_format in ("JPEG", "WEBP", "AVIF") else {}
+        img.save(tmp, target_format, **save_args)
+
+    os.replace(tmp, dest)
+    if dest != src:
+        src.unlink()
+    return str(dest)
+
+
+class Transcoder:
+    """Converts finished chapters in the shared process pool while the next ones keep downloading.
+
+    At most `workers` pages are converting at once, across every chapter.
+    """
+
+    def __init__(self, options: TranscodeOptions, workers: int = 0):
+        self.options = options
+        self.workers = workers or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(self.workers)
+
+    def _submit(self, path: Path) -> Future:
+        self._slots.acquire()
+        try:
+            future = process_pool().submit(transcode_file, str(path), self.options)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def transcode(self, files: List[Path]) -> List[Path]:
+        futures = [self._submit(f) for f in files]
+        results = []
+        for f, future in zip(files, futures):
+            try:
+                results.append(Path(future.result()))
+            except Exception:
+                # An undecodable page is still better packaged as downloaded
+                results.append(f)
+        return results
@@ -4,8 +4,10 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeRemainingColumn
 from rich.prompt import Prompt, IntPrompt, Confirm
-from typing import List, Any, Optional
-from .models import Manga, Chapter
+from typing import TYPE_CHECKING, List, Any, Optional
+
+if TYPE_CHECKING:
+    from .models import Manga, Chapter
 
 console = Console()
 
@@ -18,7 +20,7 @@ class UI:
         ))
 
     @staticmethod
-    def display_search_results(mangas: List[Manga]):
+    def display_search_results(mangas: List["Manga"]):
         table = Table(title="Search Results", show_header=True, header_style="bold magenta")
         table.add_column("No.", style="dim", width=4)
         table.add_column("Title")
@@ -43,9 +45,18 @@ class UI:
         table.add_column("Value")
         
         table.add_row("Download Format", f"[cyan]{settings.download_format}[/cyan]")
+        volume_str = "Per Chapter" if settings.pdf_volume_size <= 0 else f"{settings.pdf_volume_size} chapters"
+        table.add_row("PDF Volume", volume_str)
+        if settings.transcode_format or settings.transcode_width:
+            width_str = f"{settings.transcode_width}px" if settings.transcode_width else "original width"
+            table.add_row("Transcode", f"{settings.transcode_format or 'original format'}, {width_str}, q{settings.transcode_quality}")
         table.add_row("Keep Images", "[green]Yes[/green]" if settings.keep_images else "[red]No[/red]")
         table.add_row("Chapter Threads", str(settings.threads_chapters))
         table.add_row("Image Threads", str(settings.threads_images))
+        pages_str = "Auto" if settings.max_concurrent_pages <= 0 else str(settings.max_concurrent_pages)
+        table.add_row("Max Concurrent Pages", pages_str)
+        table.add_row("Adaptive Concurrency", "[green]On[/green]" if settings.adaptive_concurrency else "[red]Off[/red]")
+        table.add_row("Download Engine", f"[cyan]{settings.download_engine}[/cyan]")
         table.add_row("Retry Count", str(settings.retry_count))
         table.add_row("Retry Delay", f"{settings.retry_delay}s")
         table.add_row("Logging", "[green]Enabled[/green]" if settings.enable_logging else "[red]Disabled[/red]")
@@ -56,7 +67,27 @@ class UI:
         console.print(table)
 
     @staticmethod
-    def display_manga_info(manga: Manga):
+    def display_sync_results(results: dict):
+        table = Table(title="Library Sync", show_header=True, header_style="bold magenta")
+        table.add_column("Series")
+        table.add_column("New Chapters", justify="right")
+
+        for slug, count in results.items():
+            if count is None:
+                table.add_row(slug, "[red]Not found[/red]")
+            else:
+                table.add_row(slug, f"[green]{count}[/green]" if count else "[dim]0[/dim]")
+        console.print(table)
+
+    @staticmethod
+    def display_connection_stats(stats: dict):
+        console.print(
+            f"[dim]HTTP: {stats['requests']} requests over {stats['connections']} connections "
+            f"({stats['reused']} reused)[/dim]"
+        )
+
+    @staticmethod
+    def display_manga_info(manga: "Manga"):
         console.print(f"\n[bold green]Manga:[/bold green] {manga.title}")
         if manga.alternative_titles:
             console.print(f"[bold dim]Alt Titles:[/bold dim] {manga.alternative_titles}")
@@ -72,7 +103,7 @@ class UI:
             console.print(Panel(desc.strip(), title="Description", border_style="dim"))
 
     @staticmethod
-    def display_chapter_list(chapters: List[Chapter], limit: int = 20):
+    def display_chapter_list(chapters: List["Chapter"], limit: int = 20):
         if not chapters:
             return
 